@@ -0,0 +1,86 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+
+
+def refine(evaluate, angles, tol=0.1, max_jump=3, min_step=1e-3,
+           max_points=65536):
+    """Adaptively sample a pattern cut.
+
+    ``evaluate(angles)`` returns the pattern in dB at the given angles.
+    Starting from the sorted ``angles``, every interval is bisected while
+    the midpoint differs from the linear interpolation of its ends by more
+    than ``tol`` dB (curvature) or the ends differ by more than
+    ``max_jump`` dB (gradient), down to a ``min_step`` degree spacing.
+    Midpoints are evaluated in one call per refinement level.
+
+    Returns the non-uniform angles and their pattern values.
+    """
+    angles = np.asarray(angles, dtype=float)
+    values = evaluate(angles)
+    active = np.ones(np.shape(angles)[0] - 1, dtype=bool)
+
+    while np.any(active) and np.shape(angles)[0] < max_points:
+        idx = np.nonzero(active)[0]
+        idx = idx[:max_points - np.shape(angles)[0]]
+        mid = (angles[idx] + angles[idx + 1]) / 2
+        mid_values = evaluate(mid)
+
+        err = np.abs(mid_values - (values[idx] + values[idx + 1]) / 2)
+        jump = np.abs(values[idx + 1] - values[idx])
+        split = ((err > tol) | (jump > max_jump)) & \
+            (angles[idx + 1] - angles[idx] > 2 * min_step)
+
+        # a point flags the interval it starts
+        flags = np.zeros(np.shape(angles)[0], dtype=bool)
+        flags[idx] = split
+        angles = np.concatenate((angles, mid))
+        values = np.concatenate((values, mid_values))
+        flags = np.concatenate((flags, split))
+        order = np.argsort(angles, kind='stable')
+        angles = angles[order]
+        values = values[order]
+        active = flags[order][:-1]
+
+    return angles, values
@@ -41,6 +41,7 @@
 
 """
 
+import os
 import sys
 import res_rc
 import webbrowser
@@ -51,6 +52,10 @@ import numpy as np
 import matplotlib.cm as cm
 
 from calpattern import CalPattern
+import arrayio
+import elementpattern
+import fftbackend
+import wideband
 
 import pyqtgraph as pg
 import pyqtgraph.opengl as gl
@@ -66,11 +71,19 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
         super(QtWidgets.QMainWindow, self).__init__()
 
         """Constants"""
-        self.window_list = ['Square', 'Chebyshev', 'Taylor', 'Hamming', 'Hann']
+        self.window_list = ['Square', 'Chebyshev', 'Taylor', 'Hamming', 'Hann',
+                            'Bayliss']
         self.plot_list = ['3D (Az-El-Amp)', '2D Cartesian', '2D Polar',
-                          'Array layout']
+                          'Array layout', 'Beam squint', 'Frequency-angle']
+        self.steering_list = ['Phase shift', 'True time delay']
+        self.map_sizes = [1024, 2048, 4096, 8192]
+        self.element_list = ['Isotropic', 'cos^q', 'Patch', 'Dipole',
+                             'Measured table']
         self.array_config = dict()
         self.fix_azimuth = False
+        self.zoom_range = None
+        self.export_thread = None
+        self.latest = None
 
         """Load UI"""
         self.ui = uic.loadUi('ui_array_analysis.ui', self)
@@ -79,6 +92,9 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
         self.calpattern = CalPattern()
         self.calpattern_thread = QThread()
         self.calpattern.patternReady.connect(self.update_figure)
+        self.calpattern.widebandReady.connect(self.update_wideband)
+        self.calpattern.multibeamReady.connect(self.update_multibeam)
+        self.calpattern.monopulseReady.connect(self.update_monopulse)
         self.calpattern_thread.started.connect(
             self.calpattern.cal_pattern)
         self.calpattern.moveToThread(self.calpattern_thread)
@@ -140,8 +156,51 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
         self.ui.spinBox_polarMinAmp.setVisible(False)
         self.ui.horizontalSlider_polarMinAmp.setVisible(False)
 
+        self.ui.chb_uniformangle.stateChanged.connect(self.new_params)
+        self.ui.chb_adaptive.stateChanged.connect(self.new_params)
+        self.ui.spinBox_fftthreads.setValue(fftbackend.default_threads())
+        self.ui.spinBox_fftthreads.valueChanged.connect(self.new_params)
+        self.ui.spinBox_fill.valueChanged.connect(self.new_params)
+
+        """Element pattern"""
+        self.ui.cb_element.addItems(self.element_list)
+        self.element_config(0)
+        self.ui.cb_element.currentIndexChanged.connect(self.element_config)
+        self.ui.cb_element.currentIndexChanged.connect(self.new_params)
+        self.ui.dsb_elementq.valueChanged.connect(self.new_params)
+
+        """Mutual coupling"""
+        self.ui.chb_coupling.stateChanged.connect(self.new_params)
+        self.ui.spinBox_coupling.valueChanged.connect(self.new_params)
+
+        """Multi-beam"""
+        self.ui.chb_multibeam.stateChanged.connect(self.new_params)
+        self.ui.spinBox_beams.valueChanged.connect(self.new_params)
+
+        """Monopulse"""
+        self.ui.cb_diffwindow.addItems(self.window_list)
+        self.ui.cb_diffwindow.setCurrentIndex(
+            self.window_list.index('Bayliss'))
+        self.ui.chb_monopulse.stateChanged.connect(self.new_params)
+        self.ui.cb_diffwindow.currentIndexChanged.connect(self.new_params)
+
+        """Wideband"""
+        self.ui.cb_steering.addItems(self.steering_list)
+        self.ui.cb_steering.currentIndexChanged.connect(self.new_params)
+        self.ui.dsb_freqcenter.valueChanged.connect(self.new_params)
+        self.ui.dsb_freqbandwidth.valueChanged.connect(self.new_params)
+        self.ui.sb_freqpoints.valueChanged.connect(self.new_params)
+
+        self.ui.actionImport_array_config.triggered.connect(
+            self.import_array_config)
+        self.ui.actionImport_element_pattern.triggered.connect(
+            self.import_element_pattern)
+        self.ui.actionReset_standard_array.triggered.connect(
+            self.reset_standard_array)
         self.ui.actionExport_array_config.triggered.connect(
             self.export_array_config)
+        self.ui.actionSave_array_configurations.triggered.connect(
+            self.export_array_config)
         self.ui.actionExport_pattern_data.triggered.connect(
             self.export_pattern)
 
@@ -158,16 +217,23 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
         self.canvas2d_polar = pg.GraphicsLayoutWidget()
         self.canvas3d = gl.GLViewWidget()
         self.canvas3d_array = pg.GraphicsLayoutWidget()
+        self.canvas2d_squint = pg.GraphicsLayoutWidget()
+        self.canvas2d_heatmap = pg.GraphicsLayoutWidget()
 
         self.ui.layout_canvas.addWidget(self.canvas3d)
         self.ui.layout_canvas.addWidget(self.canvas3d_array)
         self.ui.layout_canvas.addWidget(self.canvas2d_cartesian)
         self.ui.layout_canvas.addWidget(self.canvas2d_polar)
+        self.ui.layout_canvas.addWidget(self.canvas2d_squint)
+        self.ui.layout_canvas.addWidget(self.canvas2d_heatmap)
 
         self.plot_type_changed(self.ui.cb_plottype.currentIndex())
 
         """Surface view"""
         self.cmap = cm.get_cmap('jet')
+        # lookup table keeps the colors in single precision
+        self.cmap_lut = self.cmap(
+            np.linspace(0, 1, self.cmap.N)).astype(np.float32)
         self.minZ = -100
         self.maxZ = 0
 
@@ -237,6 +303,7 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
         self.cartesianView.showGrid(x=True, y=True, alpha=0.5)
         self.cartesianView.setLimits(
             xMin=-90, xMax=90, yMin=-110, yMax=1, minXRange=0.1, minYRange=0.1)
+        self.cartesianView.sigXRangeChanged.connect(self.cartesian_zoomed)
 
         """Polar view"""
         self.polarView = pg.PlotItem()
@@ -289,6 +356,34 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
         self.polarView.addLine(y=0, pen=0.3).setAngle(-45)
         self.polarView.setMouseEnabled(x=False, y=False)
 
+        """Multi-beam overlays"""
+        self.cartesianBeams = []
+        self.polarBeams = []
+
+        """Beam squint view"""
+        self.squintView = pg.PlotItem()
+        self.squintPlot = pg.PlotDataItem()
+        self.squintBeam = pg.InfiniteLine(angle=0, pen=self.penHold)
+        self.canvas2d_squint.addItem(self.squintView)
+
+        self.squintPlot.setPen(self.penActive)
+        self.squintView.addItem(self.squintPlot)
+        self.squintView.addItem(self.squintBeam)
+        self.squintView.setLabel(axis='bottom', text='Frequency', units='GHz')
+        self.squintView.setLabel(axis='left', text='Beam angle', units='°')
+        self.squintView.showGrid(x=True, y=True, alpha=0.5)
+
+        """Frequency-angle view"""
+        self.heatmapView = pg.PlotItem()
+        self.heatmapImage = pg.ImageItem()
+        self.canvas2d_heatmap.addItem(self.heatmapView)
+
+        self.heatmapImage.setLookupTable(
+            (self.cmap_lut * 255).astype(np.ubyte))
+        self.heatmapView.addItem(self.heatmapImage)
+        self.heatmapView.setLabel(axis='bottom', text='Angle', units='°')
+        self.heatmapView.setLabel(axis='left', text='Frequency', units='GHz')
+
     def az_changed(self, value):
         self.ui.hs_angleaz.setValue(value * 10)
         self.new_params()
@@ -353,6 +448,15 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
         self.cartesianView.setLabel(axis='bottom', text='Azimuth', units='°')
         self.new_params()
 
+    def cartesian_zoomed(self, view, x_range):
+        x_min = max(x_range[0], -90)
+        x_max = min(x_range[1], 90)
+        if x_max - x_min < 170:
+            self.zoom_range = (x_min, x_max)
+        else:
+            self.zoom_range = None
+        self.new_params()
+
     def polar_min_amp_value_changed(self, value):
         self.ui.horizontalSlider_polarMinAmp.setValue(value)
         self.polarAmpOffset = -value
@@ -380,26 +484,62 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
         self.array_config['nfft_el'] = self.nfft_el
         self.array_config['plot_az'] = self.ui.rbsb_azimuth.value()
         self.array_config['plot_el'] = self.ui.rbsb_elevation.value()
+        self.array_config['uniform_angle'] = \
+            self.ui.chb_uniformangle.isChecked()
+        self.array_config['adaptive'] = self.ui.chb_adaptive.isChecked()
+        self.array_config['fft_threads'] = self.ui.spinBox_fftthreads.value()
+        self.array_config['fill'] = self.ui.spinBox_fill.value() / 100
+        self.array_config['element'] = elementpattern.MODELS[
+            self.ui.cb_element.currentIndex()]
+        self.array_config['element_q'] = self.ui.dsb_elementq.value()
+        self.array_config['coupling'] = self.ui.chb_coupling.isChecked()
+        self.array_config['coupling_db'] = self.ui.spinBox_coupling.value()
+        self.array_config['multibeam'] = \
+            self.ui.chb_multibeam.isChecked() and self.plot_list[
+                self.plot_type_idx] in ('2D Cartesian', '2D Polar')
+        self.array_config['beam_count'] = self.ui.spinBox_beams.value()
+        self.array_config['monopulse'] = \
+            self.ui.chb_monopulse.isChecked() and self.plot_list[
+                self.plot_type_idx] in ('2D Cartesian', '2D Polar')
+        self.array_config['diff_window'] = \
+            self.ui.cb_diffwindow.currentIndex()
+        self.array_config['wideband'] = self.plot_list[
+            self.plot_type_idx] in ('Beam squint', 'Frequency-angle')
+        self.array_config['freq_center'] = self.ui.dsb_freqcenter.value()
+        self.array_config['freq_bandwidth'] = \
+            self.ui.dsb_freqbandwidth.value()
+        self.array_config['freq_points'] = self.ui.sb_freqpoints.value()
+        self.array_config['steering'] = wideband.STEERING[
+            self.ui.cb_steering.currentIndex()]
+
+        # zoomed Cartesian cuts are evaluated only over the visible range
+        self.array_config['zoom_az'] = None
+        self.array_config['zoom_el'] = None
+        if self.plot_list[self.plot_type_idx] == '2D Cartesian':
+            if self.fix_azimuth:
+                self.array_config['zoom_el'] = self.zoom_range
+            else:
+                self.array_config['zoom_az'] = self.zoom_range
 
+        # frames of the previous configuration are not exported
+        self.latest = None
         self.calpattern.update_config(self.array_config)
 
     def update_figure(self, azimuth, elevation, pattern, x, y, weight):
-        self.exp_config = np.zeros((np.shape(x)[0], 4))
-        self.exp_config[:, 0] = x
-        self.exp_config[:, 1] = y
-        self.exp_config[:, 2] = np.abs(weight)
-        self.exp_config[:, 3] = np.angle(weight)/np.pi*180
-
-        el_grid, az_grid = np.meshgrid(elevation, azimuth)
-        el_ravel = el_grid.ravel()
-        az_ravel = az_grid.ravel()
-        self.exp_pattern = np.zeros((np.shape(el_ravel)[0], 3))
-        self.exp_pattern[:, 0] = az_ravel
-        self.exp_pattern[:, 1] = el_ravel
-        self.exp_pattern[:, 2] = pattern.ravel()
+        # emitted arrays are fresh every frame, exports only keep references
+        # and build their tables when requested
+        self.latest = (azimuth, elevation, pattern, x, y, weight)
+        if self.cartesianBeams or self.polarBeams:
+            self.beam_curves(self.cartesianView, self.cartesianBeams, 0)
+            self.beam_curves(self.polarView, self.polarBeams, 0)
+            self.ui.label_crossover.setText('')
+            self.ui.label_monopulse.setText('')
 
         if self.plot_list[self.plot_type_idx] == '3D (Az-El-Amp)':
-            rgba_img = self.cmap((pattern-self.minZ)/(self.maxZ - self.minZ))
+            lut_idx = np.clip((pattern - self.minZ) / (
+                self.maxZ - self.minZ) * self.cmap.N, 0,
+                self.cmap.N - 1).astype(np.intp)
+            rgba_img = self.cmap_lut[lut_idx]
             self.surface_plot.setData(
                 x=azimuth, y=elevation, z=pattern, colors=rgba_img)
         elif self.plot_list[self.plot_type_idx] == '2D Cartesian':
@@ -408,35 +548,121 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
             else:
                 self.cartesianPlot.setData(azimuth, pattern)
         elif self.plot_list[self.plot_type_idx] == '2D Polar':
-            pattern = pattern + self.polarAmpOffset
-            pattern[np.where(pattern < 0)] = 0
             if self.fix_azimuth:
-                x = pattern * np.sin(elevation / 180 * np.pi)
-                y = pattern * np.cos(elevation / 180 * np.pi)
+                self.polarPlot.setData(*self.polar_xy(elevation, pattern))
             else:
-                x = pattern * np.sin(azimuth / 180 * np.pi)
-                y = pattern * np.cos(azimuth / 180 * np.pi)
-
-            self.circleLabel[0].setPos(self.polarAmpOffset, 0)
-            for circle_idx in range(0, 6):
-                self.circleList[circle_idx].setRect(
-                    -self.polarAmpOffset + self.polarAmpOffset / 6 *
-                    circle_idx,
-                    -self.polarAmpOffset + self.polarAmpOffset / 6 *
-                    circle_idx,
-                    (self.polarAmpOffset - self.polarAmpOffset / 6 *
-                     circle_idx) * 2,
-                    (self.polarAmpOffset - self.polarAmpOffset / 6 *
-                     circle_idx) * 2)
-                self.circleLabel[circle_idx + 1].setText(
-                    str(round(-self.polarAmpOffset / 6 * (circle_idx + 1), 1)))
-                self.circleLabel[circle_idx + 1].setPos(
-                    self.polarAmpOffset - self.polarAmpOffset / 6 * (
-                        circle_idx + 1), 0)
-            self.polarPlot.setData(x, y)
+                self.polarPlot.setData(*self.polar_xy(azimuth, pattern))
+            self.update_polar_grid()
         elif self.plot_list[self.plot_type_idx] == 'Array layout':
             self.array_plot.setData(x=x, y=y, size=6)
 
+    def polar_xy(self, angle, pattern):
+        pattern = pattern + self.polarAmpOffset
+        pattern[np.where(pattern < 0)] = 0
+        angle = (angle / 180 * np.pi).astype(pattern.dtype)
+        return pattern * np.sin(angle), pattern * np.cos(angle)
+
+    def update_polar_grid(self):
+        self.circleLabel[0].setPos(self.polarAmpOffset, 0)
+        for circle_idx in range(0, 6):
+            self.circleList[circle_idx].setRect(
+                -self.polarAmpOffset + self.polarAmpOffset / 6 *
+                circle_idx,
+                -self.polarAmpOffset + self.polarAmpOffset / 6 *
+                circle_idx,
+                (self.polarAmpOffset - self.polarAmpOffset / 6 *
+                 circle_idx) * 2,
+                (self.polarAmpOffset - self.polarAmpOffset / 6 *
+                 circle_idx) * 2)
+            self.circleLabel[circle_idx + 1].setText(
+                str(round(-self.polarAmpOffset / 6 * (circle_idx + 1), 1)))
+            self.circleLabel[circle_idx + 1].setPos(
+                self.polarAmpOffset - self.polarAmpOffset / 6 * (
+                    circle_idx + 1), 0)
+
+    def beam_curves(self, view, curves, count):
+        """``count`` overlay curves in ``view``, colored along the fan,
+        surplus curves are removed."""
+        while len(curves) > count:
+            view.removeItem(curves.pop())
+        while len(curves) < count:
+            curves.append(pg.PlotDataItem())
+            view.addItem(curves[-1])
+        for beam_idx, curve in enumerate(curves):
+            color = self.cmap_lut[int(
+                beam_idx / max(count - 1, 1) * (self.cmap.N - 1))]
+            curve.setPen(pg.mkPen(
+                color=tuple(int(c * 255) for c in color[:3]), width=1))
+        return curves
+
+    def update_multibeam(self, azimuth, elevation, pattern, beam_az,
+                         beam_el, crossover):
+        self.overlay(azimuth, elevation, pattern)
+        self.ui.label_monopulse.setText('')
+
+        if np.size(crossover):
+            self.ui.label_crossover.setText(
+                'Crossover (dB): {:.2f} to {:.2f}'.format(
+                    np.min(crossover), np.max(crossover)))
+        else:
+            self.ui.label_crossover.setText('')
+
+    def update_monopulse(self, azimuth, elevation, pattern, slope,
+                         null_depth):
+        self.overlay(azimuth, elevation, pattern)
+        self.ui.label_crossover.setText('')
+        self.ui.label_monopulse.setText(
+            'Slope (1/°): {:.3f} / {:.3f}, null (dB): {:.1f} / {:.1f}'.format(
+                slope[0], slope[1], null_depth[0], null_depth[1]))
+
+    def overlay(self, azimuth, elevation, pattern):
+        """(B, P) cuts as overlay curves in place of the single one."""
+        angle = elevation if self.fix_azimuth else azimuth
+        self.cartesianPlot.setData([], [])
+        self.polarPlot.setData([], [])
+
+        if self.plot_list[self.plot_type_idx] == '2D Cartesian':
+            curves = self.beam_curves(
+                self.cartesianView, self.cartesianBeams, len(pattern))
+            for curve, beam in zip(curves, pattern):
+                curve.setData(angle, beam)
+        elif self.plot_list[self.plot_type_idx] == '2D Polar':
+            curves = self.beam_curves(
+                self.polarView, self.polarBeams, len(pattern))
+            for curve, beam in zip(curves, pattern):
+                curve.setData(*self.polar_xy(angle, beam))
+            self.update_polar_grid()
+
+    def update_wideband(self, frequency, azimuth, elevation, pattern,
+                        squint_az, squint_el):
+        if self.fix_azimuth:
+            angle, beam, squint = elevation, self.ui.dsb_angleel.value(), \
+                squint_el
+        else:
+            angle, beam, squint = azimuth, self.ui.dsb_angleaz.value(), \
+                squint_az
+
+        if self.plot_list[self.plot_type_idx] == 'Beam squint':
+            self.squintPlot.setData(frequency, squint)
+            self.squintBeam.setPos(beam)
+        elif self.plot_list[self.plot_type_idx] == 'Frequency-angle':
+            # pixels centred on the angle and frequency samples
+            angle_step = (angle[-1] - angle[0]) / max(np.size(angle) - 1, 1)
+            freq_step = (frequency[-1] - frequency[0]) / max(
+                np.size(frequency) - 1, 1) or 1
+            self.heatmapImage.setImage(
+                np.reshape(pattern, (np.size(frequency), -1)).T,
+                levels=(self.minZ, self.maxZ))
+            self.heatmapImage.setRect(QtCore.QRectF(
+                angle[0] - angle_step / 2, frequency[0] - freq_step / 2,
+                angle_step * np.size(angle),
+                freq_step * np.size(frequency)))
+
+    def element_config(self, element_idx):
+        visible = elementpattern.MODELS[element_idx] == 'cos'
+        self.ui.label_elementq.setVisible(visible)
+        self.ui.dsb_elementq.setVisible(visible)
+
     def windowx_config(self, window_idx):
         if self.window_list[window_idx] is 'Chebyshev':
             self.ui.sb_sidelobex.setVisible(True)
@@ -445,7 +671,7 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
             self.ui.sb_adjsidelobex.setVisible(False)
             self.ui.label_adjsidelobex.setVisible(False)
             self.ui.hs_adjsidelobex.setVisible(False)
-        elif self.window_list[window_idx] is 'Taylor':
+        elif self.window_list[window_idx] in ('Taylor', 'Bayliss'):
             self.ui.sb_sidelobex.setVisible(True)
             self.ui.label_sidelobex.setVisible(True)
             self.ui.hs_sidelobex.setVisible(True)
@@ -468,7 +694,7 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
             self.ui.sb_adjsidelobey.setVisible(False)
             self.ui.label_adjsidelobey.setVisible(False)
             self.ui.hs_adjsidelobey.setVisible(False)
-        elif self.window_list[window_idx] is 'Taylor':
+        elif self.window_list[window_idx] in ('Taylor', 'Bayliss'):
             self.ui.sb_sidelobey.setVisible(True)
             self.ui.label_sidelobey.setVisible(True)
             self.ui.hs_sidelobey.setVisible(True)
@@ -485,6 +711,10 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
 
     def plot_type_changed(self, plot_idx):
         self.plot_type_idx = plot_idx
+        self.canvas2d_squint.setVisible(
+            self.plot_list[plot_idx] == 'Beam squint')
+        self.canvas2d_heatmap.setVisible(
+            self.plot_list[plot_idx] == 'Frequency-angle')
         if self.plot_list[plot_idx] == '3D (Az-El-Amp)':
             self.canvas2d_cartesian.setVisible(False)
             self.canvas2d_polar.setVisible(False)
@@ -587,28 +817,146 @@ class AntArrayAnalysis(QtWidgets.QMainWindow):
             self.ui.rbsb_elevation.setEnabled(False)
             self.ui.rbhs_elevation.setEnabled(False)
 
+            self.ui.label_polarMinAmp.setVisible(False)
+            self.ui.spinBox_polarMinAmp.setVisible(False)
+            self.ui.horizontalSlider_polarMinAmp.setVisible(False)
+        elif self.plot_list[plot_idx] in ('Beam squint', 'Frequency-angle'):
+            self.canvas2d_cartesian.setVisible(False)
+            self.canvas2d_polar.setVisible(False)
+            self.canvas3d.setVisible(False)
+            self.canvas3d_array.setVisible(False)
+
+            # a cut over the band, along the axis picked as for 2D views
+            self.ui.rb_azimuth.setEnabled(True)
+            self.ui.rb_elevation.setEnabled(True)
+            self.ui.rb_azimuth.setChecked(self.fix_azimuth)
+            self.ui.rb_elevation.setChecked(not self.fix_azimuth)
+            self.ui.rbsb_azimuth.setEnabled(self.fix_azimuth)
+            self.ui.rbhs_azimuth.setEnabled(self.fix_azimuth)
+            self.ui.rbsb_elevation.setEnabled(not self.fix_azimuth)
+            self.ui.rbhs_elevation.setEnabled(not self.fix_azimuth)
+            if self.fix_azimuth:
+                self.nfft_az = 1
+                self.nfft_el = 1024
+            else:
+                self.nfft_az = 1024
+                self.nfft_el = 1
+
             self.ui.label_polarMinAmp.setVisible(False)
             self.ui.spinBox_polarMinAmp.setVisible(False)
             self.ui.horizontalSlider_polarMinAmp.setVisible(False)
         self.new_params()
 
+    def import_array_config(self):
+        fileName = QtWidgets.QFileDialog.getOpenFileName(
+            self, 'Import array config ...', '',
+            arrayio.file_filters(arrayio.ELEMENT_IMPORT_FORMATS))
+        if fileName[0]:
+            try:
+                x, y, weight = arrayio.load_elements(fileName[0])
+            except (OSError, ValueError) as error:
+                QtWidgets.QMessageBox.warning(
+                    self, 'Import failed', str(error))
+                return
+            # replaces the rectangular array until it is reset
+            self.calpattern.update_elements(x, y, weight)
+
+    def import_element_pattern(self):
+        fileName = QtWidgets.QFileDialog.getOpenFileName(
+            self, 'Import element pattern ...', '',
+            arrayio.file_filters(arrayio.ELEMENT_PATTERN_FORMATS))
+        if fileName[0]:
+            try:
+                angle, gain = arrayio.load_element_pattern(fileName[0])
+            except (OSError, ValueError) as error:
+                QtWidgets.QMessageBox.warning(
+                    self, 'Import failed', str(error))
+                return
+            self.calpattern.update_element_table(angle, gain)
+            self.ui.cb_element.setCurrentIndex(
+                elementpattern.MODELS.index('table'))
+
+    def reset_standard_array(self):
+        self.calpattern.clear_elements()
+
     def export_array_config(self):
-        fileName = QtGui.QFileDialog.getSaveFileName(
+        fileName = QtWidgets.QFileDialog.getSaveFileName(
             self, 'Export array config ...', 'array_config.csv',
-            'All Files (*);;CSV files (*.csv)')
-        if fileName[0] or fileName[1]:
-            np.savetxt(fileName, self.exp_config, fmt='%1.8e', delimiter=',',
-                       header='x (wavelength), y (wavelength), \
-                    amplitude (linear), phase (degree)')
+            arrayio.file_filters(arrayio.ELEMENT_FORMATS))
+        if fileName[0]:
+            path = arrayio.with_extension(
+                fileName[0], fileName[1], arrayio.ELEMENT_FORMATS)
+            self.run_export('Exporting array config ...',
+                            self.write_elements, path)
+
+    def write_elements(self, path, progress=None):
+        # the current configuration in double precision, whatever the view
+        x, y, weight = self.calpattern.active_elements(
+            *self.calpattern.array_weights('double'))
+        return arrayio.save_elements(path, x, y, weight, progress)
 
     def export_pattern(self):
-        fileName = QtGui.QFileDialog.getSaveFileName(
+        fileName = QtWidgets.QFileDialog.getSaveFileName(
             self, 'Export pattern ...', 'pattern.csv',
-            'All Files (*);;CSV files (*.csv)')
-        if fileName[0] or fileName[1]:
-            np.savetxt(fileName, self.exp_pattern, fmt='%1.8e', delimiter=',',
-                       header='azimuth (degree), elevation (degree), \
-                           pattern (dB)')
+            arrayio.file_filters(arrayio.PATTERN_FORMATS))
+        if fileName[0]:
+            path = arrayio.with_extension(
+                fileName[0], fileName[1], arrayio.PATTERN_FORMATS)
+            size = None
+            if os.path.splitext(path)[1].lower() == '.npy':
+                # memory-mapped maps are independent of the view grid
+                sizes = ['{0} x {0}'.format(num) for num in self.map_sizes]
+                item, ok = QtWidgets.QInputDialog.getItem(
+                    self, 'Export pattern ...', 'Az x El grid:', sizes,
+                    len(sizes) - 1, False)
+                if not ok:
+                    return
+                size = self.map_sizes[sizes.index(item)]
+            self.run_export('Exporting pattern ...', self.write_pattern,
+                            path, size)
+
+    def write_pattern(self, path, size=None, progress=None):
+        if os.path.splitext(path)[1].lower() == '.npy':
+            # tiled straight into a memory map, no full grid in memory
+            size = size or self.map_sizes[-1]
+            return self.calpattern.export_map(
+                path, size, size, progress=progress) is not None
+        if self.calpattern.precision == 'double' and self.latest is not None:
+            azimuth, elevation, pattern = self.latest[:3]
+        else:
+            # single precision views are evaluated again in double precision
+            azimuth, elevation, pattern = self.calpattern.compute(
+                'double')[:3]
+        return arrayio.save_pattern(path, azimuth, elevation, pattern,
+                                    self.calpattern.config, progress)
+
+    def run_export(self, label, export, *args):
+        """Run ``export(*args, progress=...)`` on a background thread
+        behind a progress dialog with a cancel button."""
+        if self.export_thread is not None and self.export_thread.isRunning():
+            return
+        self.export_dialog = QtWidgets.QProgressDialog(
+            label, 'Cancel', 0, 100, self)
+        self.export_dialog.setWindowModality(QtCore.Qt.WindowModal)
+        self.export_dialog.setMinimumDuration(500)
+
+        self.export_worker = arrayio.ExportWorker(export, *args)
+        self.export_thread = QThread()
+        self.export_worker.moveToThread(self.export_thread)
+        self.export_thread.started.connect(self.export_worker.run)
+        self.export_worker.progress.connect(self.export_dialog.setValue)
+        self.export_worker.finished.connect(self.export_finished)
+        # the worker is busy in run(), cancel directly from this thread
+        self.export_dialog.canceled.connect(
+            self.export_worker.cancel, QtCore.Qt.DirectConnection)
+        self.export_thread.start()
+
+    def export_finished(self, complete, error):
+        self.export_thread.quit()
+        self.export_thread.wait()
+        self.export_dialog.reset()
+        if error:
+            QtWidgets.QMessageBox.warning(self, 'Export failed', error)
 
     def help(self):
         webbrowser.open(
@@ -0,0 +1,529 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import warnings
+import numpy as np
+from scipy import signal
+import nufft
+import directsum
+import zoomfft
+import dbkernel
+import fftbackend
+import workspace
+
+# Array factor convention shared by all pattern engines, x and y are in λ
+#
+#   AF(az, el) = sum_n w[n] * exp(-1j * 2 * pi * (x[n] * u + y[n] * v))
+#   u = sin(az), v = sin(el)
+#
+# Patterns are normalized to sum(|w|), i.e. 0 dB at the steered beam peak.
+# All engines compute in the precision of the weights, float32/complex64
+# weights give a complex64 array factor.
+
+
+def taper(size, window='Square', sll=-60, nbar=20):
+    if size < 2 or window == 'Square':
+        return np.ones(size)
+    elif window == 'Chebyshev':
+        with warnings.catch_warnings():
+            # chebwin warns about spectral analysis use below 45 dB
+            warnings.simplefilter('ignore', UserWarning)
+            return signal.windows.chebwin(size, at=np.abs(sll))
+    elif window == 'Taylor':
+        return signal.windows.taylor(
+            size, nbar=nbar, sll=np.abs(sll), norm=False)
+    elif window == 'Hamming':
+        return signal.windows.hamming(size)
+    elif window in ('Hanning', 'Hann'):
+        return signal.windows.hann(size)
+    elif window == 'Bayliss':
+        # odd, for difference patterns
+        return bayliss((np.arange(0, size) - (size - 1) / 2) / (size / 2),
+                       sll, nbar)
+    raise ValueError('Unknown window type: ' + str(window))
+
+
+def bayliss(p, sll=-30, nbar=4):
+    """Bayliss difference distribution of a line source at normalized
+    positions ``p`` in [-1, 1], sidelobes ``sll`` dB below the peak with
+    ``nbar`` of them near that level.
+
+    Zeros of the prototype pattern use Elliott's polynomial fits of
+    Bayliss's tables, dilated by sigma to the cos(pi u) zeros beyond nbar.
+    """
+    level = np.abs(sll)
+    A = np.polyval([-2e-9, 3.43e-6, -2.7989e-4, 0.05042922, 0.3038753],
+                   level)
+    xi = [np.polyval(fit, level) for fit in (
+        [1e-8, -1.9e-6, 1.4064e-4, 0.0333885, 0.9858302],
+        [1e-8, -3.73e-6, 4.159e-4, 0.01141548, 2.00337487],
+        [-1.61e-6, 2.9281e-4, 0.00683394, 3.00636321],
+        [-8.8e-7, 2.1735e-4, 0.00501795, 4.00518423])]
+    nbar = max(int(nbar), 1)
+    n = np.arange(1, nbar)
+    xi = np.array([xi[k - 1] if k <= 4 else np.sqrt(A ** 2 + k ** 2)
+                   for k in n])
+    sigma = (nbar + 0.5) / np.sqrt(A ** 2 + nbar ** 2)
+    zeros = sigma * xi
+    m = np.arange(0, nbar) + 0.5
+    coefficient = np.empty(nbar)
+    for idx, mu in enumerate(m):
+        coefficient[idx] = (-1) ** idx * mu ** 2 * np.prod(
+            1 - mu ** 2 / zeros ** 2) / np.prod(
+                1 - mu ** 2 / np.delete(m, idx) ** 2)
+    return np.sin(np.pi * np.multiply.outer(np.asarray(p), m)) @ coefficient
+
+
+def difference_taper(size, window='Bayliss', sll=-60, nbar=20):
+    """Odd taper of a difference pattern, Bayliss or ``window`` with
+    the two halves in antiphase."""
+    sign = np.sign(np.arange(0, size) - (size - 1) / 2)
+    if window == 'Bayliss':
+        # already odd, a single element has no difference pattern
+        return taper(size, window, sll, nbar) * np.abs(sign)
+    return taper(size, window, sll, nbar) * sign
+
+
+def rect_weights(sizex, sizey, windowx='Square', sllx=-60, nbarx=20,
+                 windowy='Square', slly=-60, nbary=20, dtype=float):
+    """Taper of a rectangular array with shape (sizex, sizey)."""
+    return np.outer(taper(sizex, windowx, sllx, nbarx),
+                    taper(sizey, windowy, slly, nbary)).astype(
+                        dtype, copy=False)
+
+
+def steering(x, y, beam_az=0, beam_el=0, dtype=complex):
+    return np.exp(1j * 2 * np.pi * (
+        x * np.sin(beam_az / 180 * np.pi) +
+        y * np.sin(beam_el / 180 * np.pi))).astype(dtype, copy=False)
+
+
+def complex_dtype(dtype):
+    return np.result_type(dtype, np.complex64)
+
+
+def _normalize(AF, norm):
+    if np.ndim(norm):
+        # one norm per leading batch entry
+        norm = np.reshape(norm, np.shape(norm) + (1,) * (
+            np.ndim(AF) - np.ndim(norm)))
+        AF /= np.where(norm > 0, norm, 1)
+    elif norm > 0:
+        AF /= norm
+    return AF
+
+
+def u_grid(nfft, angle_range=None):
+    """Centre and step of the direction-cosine grid
+    u = uc + (k - nfft // 2) * du, k = 0, ..., nfft - 1.
+
+    The default grid is uniform on [-1, 1), a zoomed grid spans
+    sin(angle_range[0]) to sin(angle_range[1]) (degrees) inclusive.
+    """
+    if angle_range is None:
+        return 0.0, 2 / nfft
+    u0 = np.sin(angle_range[0] / 180 * np.pi)
+    u1 = np.sin(angle_range[1] / 180 * np.pi)
+    du = (u1 - u0) / (nfft - 1)
+    return u0 + (nfft // 2) * du, du
+
+
+def u_axis(nfft, angle_range=None):
+    uc, du = u_grid(nfft, angle_range)
+    return np.clip(uc + (np.arange(0, nfft) - nfft // 2) * du, -1, 1)
+
+
+def angle_axes(nfft_az, nfft_el, plot_az=0, plot_el=0, az_range=None,
+               el_range=None):
+    """Azimuth and elevation (degrees) on the u_axis() grid, or the cut
+    angle for an axis with nfft == 1."""
+    if nfft_az > 1:
+        azimuth = np.arcsin(u_axis(nfft_az, az_range)) / np.pi * 180
+    else:
+        azimuth = np.array([plot_az], dtype=float)
+    if nfft_el > 1:
+        elevation = np.arcsin(u_axis(nfft_el, el_range)) / np.pi * 180
+    else:
+        elevation = np.array([plot_el], dtype=float)
+    return azimuth, elevation
+
+
+def _fold_cut(weight, positions, angle, axis):
+    phase = np.exp(-1j * 2 * np.pi * positions * np.sin(
+        angle / 180 * np.pi)).astype(complex_dtype(weight.dtype), copy=False)
+    shape = [1] * weight.ndim
+    shape[axis] = -1
+    return np.sum(weight * phase.reshape(shape), axis=axis, keepdims=True)
+
+
+def _fft_bins(spacing, nfft):
+    """FFT length and the signed bins inside the visible region."""
+    length = max(int(round(nfft / (2 * spacing))), 1)
+    k = np.arange(0, nfft) - nfft // 2
+    return length, k[np.abs(k / (length * spacing)) <= 1]
+
+
+def _fft_grid(weight, spacing, nfft):
+    """Alias ``weight`` (last axis) onto one FFT period and return it with
+    the FFT length and the signed bins inside the visible region."""
+    size = np.shape(weight)[-1]
+    length, k = _fft_bins(spacing, nfft)
+    if size > length:
+        # coarse grid, alias the aperture onto one FFT period
+        blocks = -(-size // length)
+        pad = [(0, 0)] * (weight.ndim - 1) + [(0, blocks * length - size)]
+        weight = np.sum(np.pad(weight, pad).reshape(
+            np.shape(weight)[:-1] + (blocks, length)), axis=-2)
+    return weight, length, k
+
+
+def _fft_axis(weight, spacing, nfft, axis, pool=None, fft_backend=None):
+    fft_backend = fft_backend or fftbackend.numpy_fft
+    weight, length, k = _fft_grid(np.moveaxis(weight, axis, -1), spacing, nfft)
+    if pool is None:
+        spectrum = fft_backend.fft(weight, n=length, axis=-1)
+    else:
+        # transformed in place, the gather below copies the visible bins
+        spectrum = workspace.padded(pool, ('fft', axis), weight, length)
+        fft_backend.fft(spectrum, axis=-1, out=spectrum)
+    spectrum = np.take(spectrum, np.mod(k, length), axis=-1)
+    return np.moveaxis(spectrum, -1, axis), k / (length * spacing)
+
+
+def _zoom_axis(weight, spacing, nfft, angle_range, axis, pool=None,
+               fft_backend=None):
+    u = u_axis(nfft, angle_range)
+    uc, du = u_grid(nfft, angle_range)
+    return zoomfft.czt(weight, spacing, uc - (nfft // 2) * du, du, nfft,
+                       axis, pool, fft_backend), u
+
+
+def fft_pattern(weight, spacingx, spacingy, nfft_az, nfft_el,
+                plot_az=0, plot_el=0, az_range=None, el_range=None,
+                pool=None, fft_backend=None):
+    """Array factor of a regular grid, weight has shape (sizex, sizey),
+    or (..., sizex, sizey) for a batch of weight sets transformed together.
+
+    An axis with nfft == 1 is a cut at plot_az / plot_el, an axis with an
+    angle range is zoomed with the chirp-z transform. Padded transform
+    buffers are taken from ``pool`` (a workspace.WorkspacePool) if given,
+    transforms run on ``fft_backend`` (an fftbackend backend, numpy by
+    default).
+    """
+    norm = np.sum(np.abs(weight), axis=(-2, -1))
+    sizex, sizey = np.shape(weight)[-2:]
+    axis_az, axis_el = np.ndim(weight) - 2, np.ndim(weight) - 1
+    # fold the cut axes first so the transforms only see one row / column
+    if nfft_az == 1:
+        weight = _fold_cut(
+            weight, np.arange(0, sizex) * spacingx, plot_az, axis_az)
+        azimuth = np.array([plot_az], dtype=float)
+    if nfft_el == 1:
+        weight = _fold_cut(
+            weight, np.arange(0, sizey) * spacingy, plot_el, axis_el)
+        elevation = np.array([plot_el], dtype=float)
+    if nfft_az > 1 and az_range is not None:
+        weight, u = _zoom_axis(
+            weight, spacingx, nfft_az, az_range, axis_az, pool, fft_backend)
+        azimuth = np.arcsin(u) / np.pi * 180
+    elif nfft_az > 1:
+        weight, u = _fft_axis(
+            weight, spacingx, nfft_az, axis_az, pool, fft_backend)
+        azimuth = np.arcsin(u) / np.pi * 180
+    if nfft_el > 1 and el_range is not None:
+        weight, v = _zoom_axis(
+            weight, spacingy, nfft_el, el_range, axis_el, pool, fft_backend)
+        elevation = np.arcsin(v) / np.pi * 180
+    elif nfft_el > 1:
+        weight, v = _fft_axis(
+            weight, spacingy, nfft_el, axis_el, pool, fft_backend)
+        elevation = np.arcsin(v) / np.pi * 180
+
+    return azimuth, elevation, _normalize(weight, norm)
+
+
+def nufft_pattern(x, y, weight, nfft_az, nfft_el, plot_az=0, plot_el=0,
+                  eps=1e-6, az_range=None, el_range=None, fft_backend=None):
+    """Array factor of arbitrary element positions on the u_axis() grid."""
+    norm = np.sum(np.abs(weight))
+    azimuth, elevation = angle_axes(
+        nfft_az, nfft_el, plot_az, plot_el, az_range, el_range)
+    # shift each grid to its centre, the NUFFT covers the offsets k * du
+    uc, du = u_grid(nfft_az, az_range) if nfft_az > 1 else \
+        (np.sin(plot_az / 180 * np.pi), 0)
+    vc, dv = u_grid(nfft_el, el_range) if nfft_el > 1 else \
+        (np.sin(plot_el / 180 * np.pi), 0)
+    dtype = complex_dtype(weight.dtype)
+    weight = weight * np.exp(-1j * 2 * np.pi * (x * uc + y * vc)).astype(
+        dtype, copy=False)
+
+    if nfft_az > 1 and nfft_el > 1:
+        AF = nufft.nufft2d(2 * np.pi * x * du, 2 * np.pi * y * dv,
+                           weight, nfft_az, nfft_el, eps, fft_backend)
+    elif nfft_az > 1:
+        AF = nufft.nufft1d(
+            2 * np.pi * x * du, weight, nfft_az, eps,
+            fft_backend)[:, np.newaxis]
+    elif nfft_el > 1:
+        AF = nufft.nufft1d(
+            2 * np.pi * y * dv, weight, nfft_el, eps,
+            fft_backend)[np.newaxis, :]
+    else:
+        AF = np.sum(weight).reshape(1, 1)
+
+    # the gridding itself runs in double precision
+    return azimuth, elevation, _normalize(AF.astype(dtype, copy=False), norm)
+
+
+def direct_pattern(x, y, weight, nfft_az, nfft_el, plot_az=0, plot_el=0,
+                   threads=1, max_bytes=directsum.MAX_BYTES, az_range=None,
+                   el_range=None):
+    """Array factor by chunked direct summation on the angle_axes() grid."""
+    weight = np.ravel(weight)
+    norm = np.sum(np.abs(weight))
+    azimuth, elevation = angle_axes(
+        nfft_az, nfft_el, plot_az, plot_el, az_range, el_range)
+    el_grid, az_grid = np.meshgrid(elevation, azimuth)
+    AF = directsum.array_factor(
+        x, y, weight, az_grid, el_grid, threads, max_bytes)
+    return azimuth, elevation, _normalize(AF, norm)
+
+
+# Cost of one element-angle term of the direct sum relative to one
+# n * log2(n) unit of the FFT path, about 6 ns vs. 2.5 ns on one core
+DIRECT_COST = 2.5
+
+
+def fft_cost(sizex, sizey, spacingx, spacingy, nfft_az, nfft_el):
+    """Estimated cost of fft_pattern() in n * log2(n) units."""
+    cost = sizex * sizey
+    rows = 1
+    if nfft_az > 1:
+        length = _fft_bins(spacingx, nfft_az)[0]
+        cost += sizey * length * np.log2(max(length, 2))
+        rows = nfft_az
+    if nfft_el > 1:
+        length = _fft_bins(spacingy, nfft_el)[0]
+        cost += rows * length * np.log2(max(length, 2))
+    return cost
+
+
+def prefer_direct(num_active, sizex, sizey, spacingx, spacingy, nfft_az,
+                  nfft_el):
+    """True if summing ``num_active`` elements of a thinned grid directly
+    is estimated cheaper than the FFT of the full (zero filled) grid."""
+    return DIRECT_COST * num_active * nfft_az * nfft_el < fft_cost(
+        sizex, sizey, spacingx, spacingy, nfft_az, nfft_el)
+
+
+def fft_pattern_tiles(weight, spacingx, spacingy, nfft_az, nfft_el, rows,
+                      az_range=None, el_range=None, pool=None,
+                      fft_backend=None):
+    """Azimuth and elevation axes of fft_pattern() (nfft_az and nfft_el > 1)
+    and a generator of its (start, AF) tiles of at most ``rows`` azimuths.
+
+    The transform along x runs once up front, the one along y per tile, so
+    only one tile of the full grid is held at a time.
+    """
+    norm = np.sum(np.abs(weight))
+    if az_range is not None:
+        weight, u = _zoom_axis(
+            weight, spacingx, nfft_az, az_range, 0, pool, fft_backend)
+    else:
+        weight, u = _fft_axis(weight, spacingx, nfft_az, 0, pool, fft_backend)
+    if el_range is not None:
+        v = u_axis(nfft_el, el_range)
+    else:
+        length, k = _fft_bins(spacingy, nfft_el)
+        v = k / (length * spacingy)
+
+    def tiles():
+        for start in range(0, np.shape(weight)[0], rows):
+            block = weight[start:start + rows]
+            if el_range is not None:
+                block = _zoom_axis(block, spacingy, nfft_el, el_range, 1,
+                                   pool, fft_backend)[0]
+            else:
+                block = _fft_axis(
+                    block, spacingy, nfft_el, 1, pool, fft_backend)[0]
+            yield start, _normalize(block, norm)
+
+    return np.arcsin(u) / np.pi * 180, np.arcsin(v) / np.pi * 180, tiles()
+
+
+def nufft_pattern_tiles(x, y, weight, nfft_az, nfft_el, rows, eps=1e-6,
+                        az_range=None, el_range=None, fft_backend=None):
+    """Axes of nufft_pattern() (nfft_az and nfft_el > 1) and a generator of
+    its (start, AF) tiles of at most ``rows`` azimuths, each tile is a
+    NUFFT centred on its own part of the u grid."""
+    norm = np.sum(np.abs(weight))
+    azimuth, elevation = angle_axes(
+        nfft_az, nfft_el, az_range=az_range, el_range=el_range)
+    uc, du = u_grid(nfft_az, az_range)
+    vc, dv = u_grid(nfft_el, el_range)
+    dtype = complex_dtype(weight.dtype)
+    weight = weight * np.exp(-1j * 2 * np.pi * y * vc).astype(
+        dtype, copy=False)
+
+    def tiles():
+        for start in range(0, nfft_az, rows):
+            num = min(rows, nfft_az - start)
+            ut = uc + (start + num // 2 - nfft_az // 2) * du
+            AF = nufft.nufft2d(
+                2 * np.pi * x * du, 2 * np.pi * y * dv,
+                weight * np.exp(-1j * 2 * np.pi * x * ut), num, nfft_el,
+                eps, fft_backend)
+            yield start, _normalize(AF.astype(dtype, copy=False), norm)
+
+    return azimuth, elevation, tiles()
+
+
+def direct_pattern_tiles(x, y, weight, nfft_az, nfft_el, rows, threads=1,
+                         max_bytes=directsum.MAX_BYTES, az_range=None,
+                         el_range=None):
+    """Axes of direct_pattern() and a generator of its (start, AF) tiles of
+    at most ``rows`` azimuths."""
+    weight = np.ravel(weight)
+    norm = np.sum(np.abs(weight))
+    azimuth, elevation = angle_axes(
+        nfft_az, nfft_el, az_range=az_range, el_range=el_range)
+
+    def tiles():
+        for start in range(0, nfft_az, rows):
+            el_grid, az_grid = np.meshgrid(
+                elevation, azimuth[start:start + rows])
+            yield start, _normalize(directsum.array_factor(
+                x, y, weight, az_grid, el_grid, threads, max_bytes), norm)
+
+    return azimuth, elevation, tiles()
+
+
+def _mirror(k, length):
+    """Index of |k| in a half spectrum, |AF(-k)| == |AF(k)|."""
+    k = np.mod(k, length)
+    return np.minimum(k, length - k)
+
+
+def symmetric_pattern_db(weight, spacingx, spacingy, nfft_az, nfft_el,
+                         plot_az=0, plot_el=0, floor=-100, kernel=None,
+                         pool=None, fft_backend=None):
+    """dB pattern of real weights through real transforms, clipped at
+    ``floor`` dB, or None when the (cut folded) weights are complex.
+
+    Real weights have a Hermitian spectrum, so only half of it is
+    transformed and converted to dB. If the taper is also symmetric along
+    one axis, |AF| is even in both u and v and only one quadrant is
+    converted. The result is mirrored into the full output grid.
+    """
+    norm = np.sum(np.abs(weight))
+    scale = 1 / norm ** 2 if norm > 0 else 1
+    power_db = kernel or dbkernel.power_db
+    pool = pool or workspace.WorkspacePool()
+    fft_backend = fft_backend or fftbackend.numpy_fft
+    sizex, sizey = np.shape(weight)
+    if nfft_az == 1:
+        weight = _fold_cut(
+            weight, np.arange(0, sizex) * spacingx, plot_az, 0)
+    if nfft_el == 1:
+        weight = _fold_cut(
+            weight, np.arange(0, sizey) * spacingy, plot_el, 1)
+    if np.iscomplexobj(weight):
+        if np.any(weight.imag):
+            return None
+        weight = weight.real
+
+    if nfft_az > 1 and nfft_el > 1:
+        weight_x, length_x, kx = _fft_grid(weight.T, spacingx, nfft_az)
+        weight, length_y, ky = _fft_grid(weight_x.T, spacingy, nfft_el)
+        quadrant = np.allclose(weight, weight[::-1, :]) or \
+            np.allclose(weight, weight[:, ::-1])
+
+        # real transform along x keeps kx >= 0, full transform along y,
+        # both in pooled buffers, the gather below copies the output
+        size_y = np.shape(weight)[1]
+        spectrum = pool.get('rfft', (length_x // 2 + 1, length_y),
+                            complex_dtype(weight.dtype))
+        spectrum[:, size_y:] = 0
+        fft_backend.rfft(
+            workspace.padded(pool, 'rfft in', weight, length_x, 0), axis=0,
+            out=spectrum[:, :size_y])
+        fft_backend.fft(spectrum, axis=1, out=spectrum)
+        if quadrant:
+            spectrum = spectrum[:, :length_y // 2 + 1]
+        AF = power_db(spectrum, pool.get(
+            'db', np.shape(spectrum), weight.dtype), floor=floor,
+            scale=scale)
+
+        if quadrant:
+            AF = AF[np.ix_(_mirror(kx, length_x), _mirror(ky, length_y))]
+        else:
+            ix = np.mod(kx, length_x)
+            negative = ix > length_x // 2
+            iy = np.where(negative[:, np.newaxis], np.mod(-ky, length_y),
+                          np.mod(ky, length_y))
+            AF = AF[_mirror(kx, length_x)[:, np.newaxis], iy]
+        azimuth = np.arcsin(kx / (length_x * spacingx)) / np.pi * 180
+        elevation = np.arcsin(ky / (length_y * spacingy)) / np.pi * 180
+        return azimuth, elevation, AF
+
+    if nfft_az > 1:
+        axis_weight, spacing, nfft = weight[:, 0], spacingx, nfft_az
+    elif nfft_el > 1:
+        axis_weight, spacing, nfft = weight[0, :], spacingy, nfft_el
+    else:
+        AF = power_db(weight + 0j, floor=floor, scale=scale)
+        return np.array([plot_az], dtype=float), \
+            np.array([plot_el], dtype=float), AF
+
+    axis_weight, length, k = _fft_grid(axis_weight, spacing, nfft)
+    spectrum = pool.get(
+        'rfft', length // 2 + 1, complex_dtype(weight.dtype))
+    fft_backend.rfft(workspace.padded(pool, 'rfft in', axis_weight, length),
+                     out=spectrum)
+    AF = power_db(spectrum, pool.get('db', np.shape(spectrum), weight.dtype),
+                  floor=floor, scale=scale)
+    AF = AF[_mirror(k, length)]
+    angle = np.arcsin(k / (length * spacing)) / np.pi * 180
+    if nfft_az > 1:
+        return angle, np.array([plot_el], dtype=float), AF[:, np.newaxis]
+    return np.array([plot_az], dtype=float), angle, AF[np.newaxis, :]
@@ -0,0 +1,86 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+
+
+def rect_positions(sizex, sizey, spacingx=0.5, spacingy=0.5):
+    """Element positions (λ) of a rectangular grid, raveled in the
+    (sizex, sizey) order used by the weight arrays."""
+    x = np.repeat(np.arange(0, sizex) * spacingx, sizey)
+    y = np.tile(np.arange(0, sizey) * spacingy, sizex)
+    return x, y
+
+
+def random_positions(num, width, height, seed=None):
+    """Uniformly random positions inside a width x height (λ) aperture."""
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, width, num)
+    y = rng.uniform(0, height, num)
+    return x, y
+
+
+def spiral_positions(num, spacing=0.5):
+    """Sunflower (Vogel) spiral with an average element spacing in λ."""
+    n = np.arange(0, num)
+    radius = spacing * np.sqrt(n / np.pi)
+    theta = n * np.pi * (3 - np.sqrt(5))
+    return radius * np.cos(theta), radius * np.sin(theta)
+
+
+def thinning_mask(sizex, sizey, fill=0.5, seed=None):
+    """(sizex, sizey) element mask with round(fill * sizex * sizey) randomly
+    chosen elements switched on, at least one."""
+    num = sizex * sizey
+    active = min(max(int(round(fill * num)), 1), num)
+    mask = np.zeros(num, dtype=bool)
+    mask[np.random.default_rng(seed).permutation(num)[:active]] = True
+    return mask.reshape(sizex, sizey)
+
+
+def thinned_positions(sizex, sizey, spacingx=0.5, spacingy=0.5, fill=0.5,
+                      seed=None):
+    """Randomly keep a ``fill`` fraction of a rectangular grid."""
+    x, y = rect_positions(sizex, sizey, spacingx, spacingy)
+    keep = thinning_mask(sizex, sizey, fill, seed).ravel()
+    return x[keep], y[keep]
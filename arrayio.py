@@ -0,0 +1,351 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+import json
+import os
+import numpy as np
+import patternfile
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Rows per formatted chunk, one chunk is formatted with a single
+# string % tuple instead of one Python call per row
+CHUNK_ROWS = 1 << 15
+
+
+def write_csv(path, rows, num_rows, header, fmt='%1.8e', chunk_rows=CHUNK_ROWS,
+              progress=None):
+    """Write ``num_rows`` rows given in chunks by ``rows(start, stop)``.
+
+    ``progress(done, total)`` is called after every chunk, returning False
+    cancels and removes the partial file. Returns True when complete.
+    """
+    with open(path, 'w') as f:
+        f.write('# ' + header + '\n')
+        line = None
+        for start in range(0, num_rows, chunk_rows):
+            stop = min(start + chunk_rows, num_rows)
+            chunk = rows(start, stop)
+            if line is None:
+                line = ','.join([fmt] * np.shape(chunk)[1]) + '\n'
+            f.write((line * (stop - start)) % tuple(chunk.ravel().tolist()))
+            if progress is not None and not progress(stop, num_rows):
+                break
+        else:
+            return True
+    os.remove(path)
+    return False
+
+
+def write_pattern_csv(path, azimuth, elevation, pattern, progress=None,
+                      chunk_rows=CHUNK_ROWS):
+    """Stream an (azimuth, elevation, pattern) table of the grid, rows are
+    gathered from the axes chunk by chunk instead of from a meshgrid."""
+    num_el = np.size(elevation)
+    # a view for in-memory grids and memory maps alike
+    pattern = np.reshape(pattern, -1)
+
+    def rows(start, stop):
+        index = np.arange(start, stop)
+        chunk = np.empty((stop - start, 3))
+        chunk[:, 0] = azimuth[index // num_el]
+        chunk[:, 1] = elevation[index % num_el]
+        chunk[:, 2] = pattern[start:stop]
+        return chunk
+
+    return write_csv(
+        path, rows, np.size(pattern),
+        'azimuth (degree), elevation (degree), pattern (dB)',
+        chunk_rows=chunk_rows, progress=progress)
+
+
+def save_pattern_npz(path, azimuth, elevation, pattern, config=None,
+                     progress=None):
+    """Compressed archive with the axes stored once and the 2D dB grid."""
+    np.savez_compressed(
+        path, azimuth=azimuth, elevation=elevation,
+        pattern=np.reshape(pattern, (np.size(azimuth), np.size(elevation))),
+        config=json.dumps(config or {}))
+    if progress is not None:
+        progress(1, 1)
+    return True
+
+
+def save_pattern_h5(path, azimuth, elevation, pattern, config=None,
+                    progress=None, chunk_rows=256):
+    """HDF5 file with compressed, chunked datasets written by row blocks,
+    so memory-mapped grids are streamed."""
+    num_az, num_el = np.size(azimuth), np.size(elevation)
+    pattern = np.reshape(pattern, (num_az, num_el))
+    with h5py.File(path, 'w') as f:
+        f.create_dataset('azimuth', data=azimuth)
+        f.create_dataset('elevation', data=elevation)
+        grid = f.create_dataset(
+            'pattern', shape=(num_az, num_el), dtype=pattern.dtype,
+            chunks=(min(chunk_rows, num_az), num_el), compression='gzip',
+            shuffle=True)
+        grid.attrs['unit'] = 'dB'
+        f.attrs['config'] = json.dumps(config or {})
+        for start in range(0, num_az, chunk_rows):
+            grid[start:start + chunk_rows] = pattern[start:start + chunk_rows]
+            if progress is not None and \
+                    not progress(min(start + chunk_rows, num_az), num_az):
+                break
+        else:
+            return True
+    os.remove(path)
+    return False
+
+
+def save_pattern(path, azimuth, elevation, pattern, config=None,
+                 progress=None):
+    """Pattern export, the format follows the extension of ``path``."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npz':
+        return save_pattern_npz(
+            path, azimuth, elevation, pattern, config, progress)
+    elif ext in ('.h5', '.hdf5'):
+        return save_pattern_h5(
+            path, azimuth, elevation, pattern, config, progress)
+    return write_pattern_csv(path, azimuth, elevation, pattern, progress)
+
+
+def load_pattern(path):
+    """Azimuth, elevation (degrees) and the 2D dB grid of any pattern
+    export, .npy grids are opened as memory maps."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npz':
+        with np.load(path) as data:
+            return data['azimuth'], data['elevation'], data['pattern']
+    elif ext in ('.h5', '.hdf5'):
+        with h5py.File(path, 'r') as f:
+            return f['azimuth'][()], f['elevation'][()], f['pattern'][()]
+    elif ext == '.npy':
+        return patternfile.load(path)
+
+    table = np.loadtxt(path, delimiter=',', ndmin=2)
+    # rows run along elevation first
+    num_el = int(np.argmax(table[:, 0] != table[0, 0])) or np.shape(table)[0]
+    return table[::num_el, 0], table[:num_el, 1], \
+        table[:, 2].reshape(-1, num_el)
+
+
+def element_table(x, y, weight):
+    """(N, 4) x, y, amplitude and phase (degree) of the elements."""
+    weight = np.ravel(weight)
+    return np.stack((x, y, np.abs(weight), np.angle(weight, deg=True)),
+                    axis=-1)
+
+
+def write_elements_csv(path, x, y, weight, progress=None):
+    table = element_table(x, y, weight)
+    return write_csv(
+        path, lambda start, stop: table[start:stop], np.shape(table)[0],
+        'x (wavelength), y (wavelength), amplitude (linear), phase (degree)',
+        progress=progress)
+
+
+def save_elements_npz(path, x, y, weight, progress=None):
+    """Compressed columnar element table."""
+    table = element_table(x, y, weight)
+    np.savez_compressed(path, x=table[:, 0], y=table[:, 1],
+                        amplitude=table[:, 2], phase=table[:, 3])
+    if progress is not None:
+        progress(1, 1)
+    return True
+
+
+def save_elements_parquet(path, x, y, weight, progress=None):
+    table = element_table(x, y, weight)
+    pyarrow.parquet.write_table(pyarrow.table(
+        {'x': table[:, 0], 'y': table[:, 1], 'amplitude': table[:, 2],
+         'phase': table[:, 3]}), path, compression='zstd')
+    if progress is not None:
+        progress(1, 1)
+    return True
+
+
+def save_elements(path, x, y, weight, progress=None):
+    """Element table export, the format follows the extension of ``path``."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npz':
+        return save_elements_npz(path, x, y, weight, progress)
+    elif ext == '.parquet':
+        return save_elements_parquet(path, x, y, weight, progress)
+    return write_elements_csv(path, x, y, weight, progress)
+
+
+def validate_elements(x, y, amplitude, phase):
+    """Raise ValueError for element tables the pattern engine cannot use."""
+    if np.size(x) == 0:
+        raise ValueError('The element table is empty')
+    for column in (x, y, amplitude, phase):
+        if not np.all(np.isfinite(column)):
+            raise ValueError('The element table has NaN or infinite values')
+    if np.any(amplitude < 0):
+        raise ValueError('Element amplitudes must not be negative')
+    if not np.any(amplitude > 0):
+        raise ValueError('All element amplitudes are zero')
+    if np.shape(np.unique(np.stack((x, y), axis=-1), axis=0))[0] != \
+            np.size(x):
+        raise ValueError('The element table has duplicate positions')
+
+
+def load_elements(path):
+    """Element positions (wavelength) and complex weights of an element
+    table, validated.
+
+    Reads the export formats and plain (N, 4) .npy arrays, which are
+    memory mapped. CSV files are parsed by numpy in one vectorized pass.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npz':
+        with np.load(path) as data:
+            columns = [data[name] for name in
+                       ('x', 'y', 'amplitude', 'phase')]
+    elif ext == '.parquet':
+        table = pyarrow.parquet.read_table(path)
+        columns = [table.column(name).to_numpy() for name in
+                   ('x', 'y', 'amplitude', 'phase')]
+    else:
+        if ext == '.npy':
+            table = np.load(path, mmap_mode='r')
+        else:
+            table = np.loadtxt(path, delimiter=',', ndmin=2)
+        if np.ndim(table) != 2 or np.shape(table)[1] != 4:
+            raise ValueError('Element tables need the four columns x, y, '
+                             'amplitude and phase')
+        columns = np.asarray(table, dtype=float).T
+    x, y, amplitude, phase = [np.asarray(column, dtype=float)
+                              for column in columns]
+    validate_elements(x, y, amplitude, phase)
+    return x, y, amplitude * np.exp(1j * phase / 180 * np.pi)
+
+
+def load_element_pattern(path):
+    """Measured element gain, theta (degrees from broadside) and gain (dB)
+    columns of a .csv or .npy table sorted by theta."""
+    if os.path.splitext(path)[1].lower() == '.npy':
+        table = np.load(path)
+    else:
+        table = np.loadtxt(path, delimiter=',', ndmin=2)
+    if np.ndim(table) != 2 or np.shape(table)[1] != 2:
+        raise ValueError('Element patterns need the two columns theta and '
+                         'gain')
+    angle, gain = np.asarray(table, dtype=float).T
+    if not (np.all(np.isfinite(angle)) and np.all(np.isfinite(gain))):
+        raise ValueError('The element pattern has NaN or infinite values')
+    order = np.argsort(angle)
+    return angle[order], gain[order]
+
+
+PATTERN_FORMATS = [('.csv', 'CSV files (*.csv)'),
+                   ('.npz', 'NumPy archives (*.npz)'),
+                   ('.h5', 'HDF5 files (*.h5)'),
+                   ('.npy', 'NumPy memory maps, 2D grids (*.npy)')]
+ELEMENT_FORMATS = [('.csv', 'CSV files (*.csv)'),
+                   ('.npz', 'NumPy archives (*.npz)'),
+                   ('.parquet', 'Parquet files (*.parquet)')]
+ELEMENT_IMPORT_FORMATS = ELEMENT_FORMATS + [
+    ('.npy', 'NumPy arrays, N x 4 (*.npy)')]
+ELEMENT_PATTERN_FORMATS = [('.csv', 'CSV files (*.csv)'),
+                           ('.npy', 'NumPy arrays, N x 2 (*.npy)')]
+
+
+def file_filters(formats):
+    """File dialog filter of the formats whose library is installed."""
+    missing = ([] if h5py is not None else ['.h5']) + \
+        ([] if pyarrow is not None else ['.parquet'])
+    return ';;'.join([label for ext, label in formats if ext not in missing] +
+                     ['All Files (*)'])
+
+
+def with_extension(path, selected_filter, formats):
+    """``path`` with the extension of the selected filter if it has none."""
+    if os.path.splitext(path)[1]:
+        return path
+    for ext, label in formats:
+        if label == selected_filter:
+            return path + ext
+    return path + formats[0][0]
+
+
+class ExportWorker(QObject):
+    """Runs ``export(*args, progress=...)`` on its thread, ``cancel()``
+    may be called from any thread and stops it at the next chunk."""
+
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, export, *args):
+        super().__init__()
+        self.export = export
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report(self, done, total):
+        self.progress.emit(int(100 * done / max(total, 1)))
+        return not self.cancelled
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            complete = self.export(*self.args, progress=self.report)
+        except Exception as error:
+            # nothing may escape a slot, report every failure instead
+            self.finished.emit(False, str(error) or type(error).__name__)
+        else:
+            self.finished.emit(bool(complete), '')
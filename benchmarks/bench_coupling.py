@@ -0,0 +1,89 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from scipy.linalg import solve
+import arrayfactor
+import arraygeometry
+import coupling
+
+# Coupled weights of a rectangular grid, dense matrix product vs. the
+# block-Toeplitz FFT convolution, and decoupling with and without the
+# cached LU factorisation
+
+SIZES = [(16, 16), (32, 32), (48, 48)]
+MODEL = {'level_db': -20, 'decay': 1.0, 'max_distance': None}
+
+
+def timed(func, number=5):
+    return min(repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    print('{:<10}{:>12}{:>12}{:>14}{:>14}'.format(
+        'grid', 'dense (ms)', 'fft (ms)', 'solve (ms)', 'cached (ms)'))
+    for sizex, sizey in SIZES:
+        weight = arrayfactor.rect_weights(
+            sizex, sizey, 'Taylor', -35, 4, 'Taylor', -35, 4) + 0j
+        x, y = arraygeometry.rect_positions(sizex, sizey, 0.5, 0.5)
+        coupler = coupling.Coupling()
+        matrix, key = coupler.matrix(x, y, MODEL)
+        dense = timed(lambda: coupler.dense(matrix, weight))
+        coupler.grid(weight, 0.5, 0.5, MODEL)
+        fft = timed(lambda: coupler.grid(weight, 0.5, 0.5, MODEL))
+        direct = timed(lambda: solve(matrix, np.ravel(weight)), number=1)
+        coupler.decouple(matrix, weight, key)
+        cached = timed(lambda: coupler.decouple(matrix, weight, key))
+        print('{:<10}{:>12.2f}{:>12.2f}{:>14.2f}{:>14.2f}'.format(
+            '{}x{}'.format(sizex, sizey), dense * 1000, fft * 1000,
+            direct * 1000, cached * 1000))
+
+
+if __name__ == '__main__':
+    main()
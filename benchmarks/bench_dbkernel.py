@@ -0,0 +1,98 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from dbkernel import DbKernel
+
+# Per-frame allocations and time of the dB conversion, the previous
+# 20 * log10(|AF| + 1e-5) expression vs. the fused kernel writing into a
+# preallocated buffer
+
+CASES = [
+    ('cut 4096', (4096, 1)),
+    ('grid 512x512', (512, 512)),
+    ('grid 2048x2048', (2048, 2048)),
+]
+
+
+def expression(AF, out):
+    return 20 * np.log10(np.abs(AF) + 0.00001)
+
+
+def traced(func, AF, out):
+    func(AF, out)
+    tracemalloc.start()
+    func(AF, out)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+
+def main():
+    rng = np.random.default_rng(0)
+    kernel = DbKernel()
+    print('{:<24}{:>12}{:>14}{:>14}{:>11}'.format(
+        'case', 'dtype', 'alloc (KB)', 'peak (KB)', 'time (ms)'))
+    for name, shape in CASES:
+        for dtype in (np.complex64, np.complex128):
+            AF = (rng.standard_normal(shape) +
+                  1j * rng.standard_normal(shape)).astype(dtype)
+            out = np.empty(shape, dtype=AF.real.dtype)
+            for label, func in (('expr', expression), ('kernel', kernel)):
+                current, peak = traced(func, AF, out)
+                time = min(repeat(lambda: func(AF, out), number=5,
+                                  repeat=3)) / 5
+                print('{:<24}{:>12}{:>14.1f}{:>14.1f}{:>11.3f}'.format(
+                    name + ' ' + label, np.dtype(dtype).name,
+                    current / 1024, peak / 1024, time * 1000))
+
+
+if __name__ == '__main__':
+    main()
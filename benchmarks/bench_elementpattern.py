@@ -0,0 +1,90 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+import elementpattern
+
+# Per-frame cost of an element pattern, sampled every frame vs. taken from
+# the grid cache and multiplied in place, next to the array factor itself
+
+GRIDS = [('cut 4096', (4096, 1)), ('grid 512x512', (512, 512))]
+MODELS = [('cos', {'q': 1.5}), ('patch', {}), ('dipole', {})]
+
+
+def timed(func):
+    return min(repeat(func, number=5, repeat=3)) / 5
+
+
+def main():
+    weight = arrayfactor.rect_weights(
+        32, 32, 'Taylor', -35, 4, 'Taylor', -35, 4, dtype=np.float32) + 0j
+    print('{:<14}{:>8}{:>12}{:>14}{:>12}'.format(
+        'grid', 'model', 'AF (ms)', 'sampled (ms)', 'cached (ms)'))
+    for name, nfft in GRIDS:
+        azimuth, elevation, AF = arrayfactor.fft_pattern(
+            weight, 0.5, 0.5, *nfft)
+        af_time = timed(lambda: arrayfactor.fft_pattern(
+            weight, 0.5, 0.5, *nfft))
+        for model, params in MODELS:
+            element = elementpattern.ElementPattern(model, params)
+
+            def sample():
+                field = elementpattern.element_field(
+                    model, azimuth, elevation, params)
+                np.multiply(AF, field, out=AF, casting='unsafe')
+            sampled = timed(sample)
+            element.apply(AF, azimuth, elevation)
+            cached = timed(lambda: element.apply(AF, azimuth, elevation))
+            print('{:<14}{:>8}{:>12.2f}{:>14.2f}{:>12.2f}'.format(
+                name, model, af_time * 1000, sampled * 1000, cached * 1000))
+
+
+if __name__ == '__main__':
+    main()
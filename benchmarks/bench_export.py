@@ -0,0 +1,123 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+import arrayio
+import dbkernel
+
+# Pattern CSV export, np.savetxt of a materialized (N*M, 3) meshgrid table
+# vs. the chunked streaming writer, then size and round trip time of every
+# installed export format for a 512x512 pattern
+
+SIZES = [128, 256, 512, 1024]
+
+
+def savetxt(path, azimuth, elevation, pattern):
+    el_grid, az_grid = np.meshgrid(elevation, azimuth)
+    table = np.zeros((np.size(el_grid), 3))
+    table[:, 0] = az_grid.ravel()
+    table[:, 1] = el_grid.ravel()
+    table[:, 2] = pattern.ravel()
+    np.savetxt(path, table, fmt='%1.8e', delimiter=',',
+               header='azimuth (degree), elevation (degree), pattern (dB)')
+
+
+def streamed(path, azimuth, elevation, pattern):
+    arrayio.write_pattern_csv(path, azimuth, elevation, pattern)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    path = os.path.join(tempfile.mkdtemp(), 'pattern.csv')
+    print('{:<10}{:>10}{:>12}{:>12}'.format(
+        'size', 'writer', 'time (s)', 'peak (MB)'))
+    for size in SIZES:
+        azimuth = np.linspace(-90, 90, size)
+        elevation = np.linspace(-90, 90, size)
+        pattern = -100 * rng.random((size, size)).astype(np.float32)
+        for label, func in (('savetxt', savetxt), ('stream', streamed)):
+            start = time.perf_counter()
+            func(path, azimuth, elevation, pattern)
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            func(path, azimuth, elevation, pattern)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print('{:<10}{:>10}{:>12.2f}{:>12.1f}'.format(
+                '{0}x{0}'.format(size), label, elapsed, peak / 2 ** 20))
+    os.remove(path)
+
+    weight = arrayfactor.rect_weights(
+        32, 32, 'Taylor', -35, 4, 'Taylor', -35, 4, dtype=np.float32)
+    azimuth, elevation, AF = arrayfactor.fft_pattern(
+        weight + 0j, 0.5, 0.5, 512, 512)
+    pattern = dbkernel.power_db(AF)
+    print()
+    print('{:<10}{:>12}{:>12}{:>12}'.format(
+        'format', 'size (KB)', 'save (s)', 'load (s)'))
+    for ext in ('.csv', '.npz', '.h5'):
+        if ext == '.h5' and arrayio.h5py is None:
+            continue
+        path = os.path.join(os.path.dirname(path), 'pattern' + ext)
+        start = time.perf_counter()
+        arrayio.save_pattern(path, azimuth, elevation, pattern)
+        save = time.perf_counter() - start
+        start = time.perf_counter()
+        arrayio.load_pattern(path)
+        load = time.perf_counter() - start
+        print('{:<10}{:>12.0f}{:>12.3f}{:>12.3f}'.format(
+            ext, os.path.getsize(path) / 1024, save, load))
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import fftbackend
+
+# In-place 2D transform (one pass per axis, as in fft_pattern) of a
+# complex64 grid for every installed backend, grid size and thread count.
+# Usage: bench_fftbackend.py [max threads]
+
+SIZES = [64, 128, 256, 512, 1024, 2048, 4096]
+
+
+def thread_counts(max_threads):
+    counts = [1]
+    while counts[-1] * 2 <= max_threads:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_threads:
+        counts.append(max_threads)
+    return counts
+
+
+def main():
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else \
+        os.cpu_count() or 1
+    rng = np.random.default_rng(0)
+    print('{:<8}{:>8}{:>10}{:>12}{:>10}'.format(
+        'backend', 'size', 'threads', 'time (ms)', 'speedup'))
+    for size in SIZES:
+        grid = (rng.standard_normal((size, size)) +
+                1j * rng.standard_normal((size, size))).astype(np.complex64)
+        buffer = np.empty_like(grid)
+        number = max(1, 2 ** 22 // (size * size))
+        baseline = None
+        for name in fftbackend.available():
+            counts = [1] if name == 'numpy' else thread_counts(max_threads)
+            for threads in counts:
+                backend = fftbackend.get_backend(name, threads)
+
+                def transform():
+                    buffer[...] = grid
+                    backend.fft(buffer, axis=0, out=buffer)
+                    backend.fft(buffer, axis=1, out=buffer)
+
+                # the first call plans
+                transform()
+                time = min(repeat(transform, number=number,
+                                  repeat=3)) / number
+                baseline = baseline or time
+                print('{:<8}{:>8}{:>10}{:>12.3f}{:>10.2f}'.format(
+                    name, size, threads, time * 1000, baseline / time))
+
+
+if __name__ == '__main__':
+    main()
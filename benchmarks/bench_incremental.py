@@ -0,0 +1,98 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+import arraygeometry
+import incremental
+
+# Full pattern evaluation vs. one rank-1 element update of an
+# IncrementalPattern, and the error after a run of updates
+
+CASES = [
+    ('64x64 cut 4096', (64, 64), (4096, 1)),
+    ('64x64 grid 256x256', (64, 64), (256, 256)),
+    ('128x128 grid 512x512', (128, 128), (512, 512)),
+]
+UPDATES = 2000
+
+
+def timed(func, number):
+    return min(repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    print('{:<22}{:>11}{:>14}{:>9}{:>12}'.format(
+        'case', 'full (ms)', 'update (ms)', 'ratio', 'max error'))
+    rng = np.random.default_rng(0)
+    for name, size, nfft in CASES:
+        x, y = arraygeometry.rect_positions(size[0], size[1])
+        weight = arrayfactor.rect_weights(
+            size[0], size[1], 'Taylor', -35, 4, 'Taylor', -35, 4) * \
+            arrayfactor.steering(x, y, 10, 0).reshape(size)
+
+        def full(weight):
+            return arrayfactor.fft_pattern(
+                weight.reshape(size), 0.5, 0.5, nfft[0], nfft[1])
+
+        inc = incremental.IncrementalPattern(
+            x, y, weight, full, refresh=10 ** 9)
+        index = rng.integers(np.size(weight), size=UPDATES)
+        full_time = timed(lambda: full(inc.weight), 3)
+        update_time = timed(lambda: inc.update(index[0], 0.5), 20)
+        for k in index:
+            inc.update(k, rng.normal() + 1j * rng.normal())
+        error = np.abs(inc.pattern() - full(inc.weight)[2]).max()
+        print('{:<22}{:>11.2f}{:>14.3f}{:>9.1f}{:>12.1e}'.format(
+            name, full_time * 1000, update_time * 1000,
+            full_time / update_time, error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calpattern import CalPattern
+
+# Sum and both difference channels of a 64x64 grid in one batched pass
+# vs. three single channel patterns with the taper swapped in between
+
+GRIDS = [('cut 4096', (4096, 1)), ('grid 128x128', (128, 128)),
+         ('grid 512x512', (512, 512))]
+
+
+def timed(func):
+    return min(repeat(func, number=3, repeat=3)) / 3
+
+
+def main():
+    calpattern = CalPattern()
+    print('{:<14}{:>15}{:>18}{:>14}'.format(
+        'grid', 'monopulse (ms)', 'per channel (ms)', 'metrics (ms)'))
+    for name, (nfft_az, nfft_el) in GRIDS:
+        calpattern.update_config({
+            'sizex': 64, 'sizey': 64, 'spacingx': 0.5, 'spacingy': 0.5,
+            'beam_az': 10, 'beam_el': 0, 'windowx': 2, 'windowy': 2,
+            'sllx': -35, 'slly': -35, 'nbarx': 5, 'nbary': 5,
+            'nfft_az': nfft_az, 'nfft_el': nfft_el, 'plot_az': 0,
+            'plot_el': 0, 'monopulse': True, 'diff_window': 5})
+        batched = timed(calpattern.compute_monopulse)
+
+        def per_channel():
+            for windowx, windowy in ((2, 2), (5, 2), (2, 5)):
+                calpattern.windowx = windowx
+                calpattern.windowy = windowy
+                calpattern.compute()
+            calpattern.windowx = calpattern.windowy = 2
+        single = timed(per_channel)
+        x, y, weight = calpattern.monopulse_weights()
+        metrics = timed(lambda: calpattern.monopulse_metrics(x, y, weight))
+        print('{:<14}{:>15.2f}{:>18.2f}{:>14.2f}'.format(
+            name, batched * 1000, single * 1000, metrics * 1000))
+
+
+if __name__ == '__main__':
+    main()
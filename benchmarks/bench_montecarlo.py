@@ -0,0 +1,98 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+import arraygeometry
+from dbkernel import power_db
+import montecarlo
+
+# Element failure Monte Carlo, one FFT per trial with all patterns kept vs.
+# stacked FFTs with streamed histograms, on one and on all cores
+
+SIZE = (64, 16)
+NFFT = (4096, 1)
+TRIALS = 2000
+RATE = 0.05
+
+
+def main():
+    x, y = arraygeometry.rect_positions(*SIZE)
+    weight = arrayfactor.rect_weights(
+        SIZE[0], SIZE[1], 'Taylor', -35, 4, 'Taylor', -35, 4,
+        dtype=np.float32) * arrayfactor.steering(
+            x, y, 10, 0, np.complex64).reshape(SIZE)
+
+    start = perf_counter()
+    rng = np.random.default_rng(0)
+    patterns = np.empty((TRIALS, NFFT[0]), dtype=np.float32)
+    for k in range(TRIALS):
+        mask = montecarlo.failure_masks(rng, 1, np.size(weight), RATE)
+        patterns[k] = power_db(arrayfactor.fft_pattern(
+            weight * mask.reshape(SIZE), 0.5, 0.5, *NFFT)[2]).ravel()
+    np.percentile(patterns, [90, 99], axis=0)
+    loop = perf_counter() - start
+
+    print('{:<26}{:>10}{:>14}'.format('method', 'time (s)', 'memory (MB)'))
+    print('{:<26}{:>10.2f}{:>14.1f}'.format(
+        'per trial, all kept', loop, patterns.nbytes / 1e6))
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = perf_counter()
+        histogram = montecarlo.failure_analysis(
+            x, y, weight, RATE, TRIALS, NFFT[0], NFFT[1], grid=(0.5, 0.5),
+            workers=workers)[2]
+        histogram.percentile(90)
+        histogram.percentile(99)
+        print('{:<26}{:>10.2f}{:>14.1f}'.format(
+            'batched, {} worker(s)'.format(workers), perf_counter() - start,
+            histogram.counts.nbytes / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calpattern import CalPattern
+
+# Simultaneous beams of a 64x64 grid, one batched computation vs. steering
+# and computing the single beam pattern once per beam
+
+GRIDS = [('cut 4096', (4096, 1)), ('grid 128x128', (128, 128)),
+         ('grid 512x512', (512, 512))]
+BEAMS = [8, 32]
+
+
+def timed(func):
+    return min(repeat(func, number=3, repeat=3)) / 3
+
+
+def main():
+    calpattern = CalPattern()
+    print('{:<14}{:>7}{:>14}{:>15}'.format(
+        'grid', 'beams', 'batched (ms)', 'per beam (ms)'))
+    for name, (nfft_az, nfft_el) in GRIDS:
+        for count in BEAMS:
+            calpattern.update_config({
+                'sizex': 64, 'sizey': 64, 'spacingx': 0.5, 'spacingy': 0.5,
+                'beam_az': 10, 'beam_el': 0, 'windowx': 2, 'windowy': 2,
+                'sllx': -35, 'slly': -35, 'nbarx': 4, 'nbary': 4,
+                'nfft_az': nfft_az, 'nfft_el': nfft_el, 'plot_az': 0,
+                'plot_el': 0, 'multibeam': True, 'beam_count': count})
+            batched = timed(calpattern.compute_multibeam)
+            beam_az = calpattern.beam_angles()[0]
+
+            def per_beam():
+                for angle in beam_az:
+                    calpattern.beam_az = angle
+                    calpattern.compute()
+            single = timed(per_beam)
+            calpattern.beam_az = 10
+            print('{:<14}{:>7}{:>14.2f}{:>15.2f}'.format(
+                name, count, batched * 1000, single * 1000))
+
+
+if __name__ == '__main__':
+    main()
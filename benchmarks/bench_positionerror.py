@@ -0,0 +1,83 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arrayfactor
+import arraygeometry
+import positionerror
+
+# Position error study of a 64x64 array, NUFFT vs. direct sum per trial and
+# the projected time of 1000 trials
+
+SIZE = (64, 64)
+CASES = [('cut 4096', (4096, 1)), ('grid 128x128', (128, 128))]
+TRIALS = {'nufft': 20, 'direct': 2}
+
+
+def main():
+    x, y = arraygeometry.rect_positions(*SIZE)
+    weight = arrayfactor.rect_weights(
+        SIZE[0], SIZE[1], 'Taylor', -35, 4, 'Taylor', -35, 4) * \
+        arrayfactor.steering(x, y, 10, 0).reshape(SIZE)
+
+    print('{:<14}{:>8}{:>16}{:>18}{:>12}'.format(
+        'case', 'method', 'per trial (ms)', '1000 trials (s)', 'E[PSL]'))
+    for name, nfft in CASES:
+        for method, trials in TRIALS.items():
+            start = perf_counter()
+            result = positionerror.position_analysis(
+                x, y, weight, 0.02, trials, nfft[0], nfft[1],
+                method=method, workers=1)[2]
+            time = (perf_counter() - start) / trials
+            print('{:<14}{:>8}{:>16.1f}{:>18.1f}{:>12.2f}'.format(
+                name, method, time * 1000, time * 1000,
+                result['expected_psl']))
+
+
+if __name__ == '__main__':
+    main()
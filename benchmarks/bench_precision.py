@@ -0,0 +1,92 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+import dbkernel
+
+# Single vs. double precision pattern pipeline: time per frame and the dB
+# error of the single precision output against double precision
+
+CASES = [
+    ('cut 64', (64, 1), (4096, 1)),
+    ('cut 1024', (1024, 1), (4096, 1)),
+    ('grid 64x64', (64, 64), (512, 512)),
+    ('grid 128x128', (128, 128), (1024, 1024)),
+    ('grid 256x256', (256, 256), (2048, 2048)),
+]
+
+
+def pattern(size, nfft, dtype):
+    weight = arrayfactor.rect_weights(
+        size[0], size[1], 'Taylor', -35, 4, 'Taylor', -35, 4, dtype=dtype)
+    x = np.repeat(np.arange(0, size[0]) * 0.5, size[1])
+    y = np.tile(np.arange(0, size[1]) * 0.5, size[0])
+    weight = weight * arrayfactor.steering(
+        x, y, 10, 5, arrayfactor.complex_dtype(dtype)).reshape(size)
+    AF = arrayfactor.fft_pattern(weight, 0.5, 0.5, nfft[0], nfft[1])[2]
+    return dbkernel.power_db(AF)
+
+
+if __name__ == '__main__':
+    print('{:<14}{:>10}{:>10}{:>10}{:>12}{:>12}'.format(
+        'case', 'f64 (ms)', 'f32 (ms)', 'speedup', 'err>-60dB', 'err>-90dB'))
+    for name, size, nfft in CASES:
+        number = 3 if nfft[0] * nfft[1] > 2 ** 20 else 20
+        t64 = min(repeat(lambda: pattern(size, nfft, np.float64),
+                         number=number, repeat=3)) / number
+        t32 = min(repeat(lambda: pattern(size, nfft, np.float32),
+                         number=number, repeat=3)) / number
+        p64 = pattern(size, nfft, np.float64)
+        p32 = pattern(size, nfft, np.float32)
+        assert p32.dtype == np.float32
+        err = np.abs(p32 - p64)
+        print('{:<14}{:>10.2f}{:>10.2f}{:>10.2f}{:>12.2e}{:>12.2e}'.format(
+            name, t64 * 1e3, t32 * 1e3, t64 / t32,
+            np.max(err[p64 > -60]), np.max(err[p64 > -90])))
@@ -0,0 +1,91 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+import dbkernel
+
+# Real symmetric taper at broadside, full complex path vs. real transforms
+# with mirrored dB output
+
+CASES = [
+    ('cut 64', (64, 1), (4096, 1)),
+    ('cut 1024', (1024, 1), (4096, 1)),
+    ('grid 64x64', (64, 64), (512, 512)),
+    ('grid 128x128', (128, 128), (1024, 1024)),
+    ('grid 256x256', (256, 256), (2048, 2048)),
+]
+
+
+def full_path(weight, nfft_az, nfft_el):
+    azimuth, elevation, AF = arrayfactor.fft_pattern(
+        weight + 0j, 0.5, 0.5, nfft_az, nfft_el)
+    return dbkernel.power_db(AF)
+
+
+def symmetric_path(weight, nfft_az, nfft_el):
+    return arrayfactor.symmetric_pattern_db(
+        weight, 0.5, 0.5, nfft_az, nfft_el)[2]
+
+
+if __name__ == '__main__':
+    print('{:<14}{:>12}{:>12}{:>9}{:>14}'.format(
+        'case', 'full (ms)', 'real (ms)', 'speedup', 'max err (dB)'))
+    for name, size, nfft in CASES:
+        weight = arrayfactor.rect_weights(
+            size[0], size[1], 'Taylor', -35, 4, 'Taylor', -35, 4)
+        number = 3 if nfft[0] * nfft[1] > 2 ** 20 else 20
+        t_full = min(repeat(lambda: full_path(weight, *nfft),
+                            number=number, repeat=3)) / number
+        t_sym = min(repeat(lambda: symmetric_path(weight, *nfft),
+                           number=number, repeat=3)) / number
+        err = np.max(np.abs(full_path(weight, *nfft) -
+                            symmetric_path(weight, *nfft)))
+        print('{:<14}{:>12.3f}{:>12.3f}{:>9.2f}{:>14.2e}'.format(
+            name, t_full * 1e3, t_sym * 1e3, t_full / t_sym, err))
@@ -0,0 +1,96 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+import arraygeometry
+
+# Thinned rectangular grids, FFT of the zero filled grid vs. direct sum over
+# the active elements, and the path arrayfactor.prefer_direct() picks
+
+CASES = [
+    ('64x64 cut 4096', (64, 64), (4096, 1)),
+    ('256x256 cut 4096', (256, 256), (4096, 1)),
+    ('64x64 grid 256x256', (64, 64), (256, 256)),
+]
+FILLS = [1.0, 0.5, 0.1, 0.01, 0.001]
+
+
+def timed(func):
+    return min(repeat(func, number=1, repeat=3))
+
+
+def main():
+    print('{:<22}{:>8}{:>9}{:>11}{:>12}{:>8}'.format(
+        'case', 'fill', 'active', 'fft (ms)', 'direct (ms)', 'picks'))
+    for name, size, nfft in CASES:
+        x, y = arraygeometry.rect_positions(size[0], size[1])
+        weight = arrayfactor.rect_weights(
+            size[0], size[1], 'Taylor', -35, 4, 'Taylor', -35, 4,
+            dtype=np.float32) * arrayfactor.steering(
+                x, y, 10, 0, np.complex64).reshape(size)
+        for fill in FILLS:
+            mask = arraygeometry.thinning_mask(size[0], size[1], fill, 0)
+            active = mask.ravel()
+            masked = weight * mask
+            fft = timed(lambda: arrayfactor.fft_pattern(
+                masked, 0.5, 0.5, nfft[0], nfft[1]))
+            direct = timed(lambda: arrayfactor.direct_pattern(
+                x[active], y[active], masked.ravel()[active], nfft[0],
+                nfft[1]))
+            picks = 'direct' if arrayfactor.prefer_direct(
+                np.count_nonzero(mask), size[0], size[1], 0.5, 0.5, nfft[0],
+                nfft[1]) else 'fft'
+            print('{:<22}{:>8}{:>9}{:>11.2f}{:>12.2f}{:>8}'.format(
+                name, fill, np.count_nonzero(mask), fft * 1000,
+                direct * 1000, picks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arrayfactor
+import arraygeometry
+import tolerance
+
+# Tolerance analysis time per realization against the batch size, batch 1
+# is the per-realization Python loop
+
+SIZE = (64, 16)
+NFFT = (4096, 1)
+TRIALS = 512
+BATCHES = [1, 8, 64, 256]
+
+
+def main():
+    x, y = arraygeometry.rect_positions(*SIZE)
+    weight = arrayfactor.rect_weights(
+        SIZE[0], SIZE[1], 'Taylor', -35, 4, 'Taylor', -35, 4) * \
+        arrayfactor.steering(x, y, 20, 0).reshape(SIZE)
+
+    print('{:>8}{:>16}{:>14}{:>10}'.format(
+        'batch', 'per trial (ms)', 'E[PSL] (dB)', 'RMS err'))
+    for batch in BATCHES:
+        def run():
+            return tolerance.tolerance_analysis(
+                x, y, weight, TRIALS, NFFT[0], NFFT[1], grid=(0.5, 0.5),
+                phase_bits=6, step_db=0.5, range_db=31.5, amplitude_db=0.5,
+                phase_deg=5, batch=batch)[2]
+        time = min(repeat(run, number=1, repeat=3))
+        result = run()
+        print('{:>8}{:>16.3f}{:>14.2f}{:>10.4f}'.format(
+            batch, time / TRIALS * 1000, result['expected_psl'],
+            result['pointing_error']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+import arraygeometry
+import directsum
+import wideband
+
+# Patterns over a band, one frequency at a time by direct sum with scaled
+# positions vs. one batched wideband_pattern() call
+
+SIZE = (64, 16)
+CASES = [('cut 1024', (1024, 1)), ('grid 128x64', (128, 64))]
+POINTS = [8, 33]
+
+
+def timed(func):
+    return min(repeat(func, number=1, repeat=3))
+
+
+def main():
+    x, y = arraygeometry.rect_positions(*SIZE)
+    weight = arrayfactor.rect_weights(
+        SIZE[0], SIZE[1], 'Taylor', -35, 4, 'Taylor', -35, 4) * \
+        arrayfactor.steering(x, y, 30, 0).reshape(SIZE)
+
+    print('{:<14}{:>8}{:>18}{:>14}{:>10}'.format(
+        'case', 'freqs', 'per freq (ms)', 'batched (ms)', 'speedup'))
+    for name, nfft in CASES:
+        azimuth = wideband.angle_axis(nfft[0])
+        elevation = wideband.angle_axis(nfft[1])
+        el_grid, az_grid = np.meshgrid(elevation, azimuth)
+        for num in POINTS:
+            frequency = wideband.frequencies(10, 2, num)
+
+            def loop():
+                return [directsum.array_factor(
+                    x * f / 10, y * f / 10, np.ravel(weight), az_grid,
+                    el_grid) for f in frequency]
+
+            def batched():
+                return wideband.wideband_pattern(
+                    x, y, weight, frequency, 10, azimuth, elevation, 30,
+                    grid=(0.5, 0.5))
+            loop_time = timed(loop)
+            batched_time = timed(batched)
+            print('{:<14}{:>8}{:>18.1f}{:>14.1f}{:>10.1f}'.format(
+                name, num, loop_time * 1000, batched_time * 1000,
+                loop_time / batched_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import os
+import sys
+from timeit import repeat
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import arrayfactor
+from workspace import WorkspacePool
+
+# Per-frame allocations and time of a steered pattern grid, fresh padded
+# FFT buffers vs. buffers reused from a workspace pool
+
+CASES = [
+    ('grid 512x512', (64, 64), (512, 512)),
+    ('grid 1024x1024', (128, 128), (1024, 1024)),
+    ('grid 2048x2048', (256, 256), (2048, 2048)),
+]
+
+
+def weights(size, dtype):
+    weight = arrayfactor.rect_weights(
+        size[0], size[1], 'Taylor', -35, 4, 'Taylor', -35, 4, dtype=dtype)
+    x, y = np.meshgrid(np.arange(0, size[0]) * 0.5,
+                       np.arange(0, size[1]) * 0.5, indexing='ij')
+    return weight * arrayfactor.steering(
+        x.ravel(), y.ravel(), 10, 5,
+        arrayfactor.complex_dtype(dtype)).reshape(size)
+
+
+def traced(func):
+    func()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    print('{:<24}{:>12}{:>14}{:>11}'.format(
+        'case', 'dtype', 'peak (MB)', 'time (ms)'))
+    for name, size, nfft in CASES:
+        for dtype in (np.float32, np.float64):
+            weight = weights(size, dtype)
+            pool = WorkspacePool()
+            for label, kwargs in (('fresh', {}), ('pooled', {'pool': pool})):
+                def frame():
+                    arrayfactor.fft_pattern(
+                        weight, 0.5, 0.5, nfft[0], nfft[1], **kwargs)
+                peak = traced(frame)
+                time = min(repeat(frame, number=3, repeat=3)) / 3
+                print('{:<24}{:>12}{:>14.1f}{:>11.2f}'.format(
+                    name + ' ' + label, np.dtype(dtype).name,
+                    peak / 2 ** 20, time * 1000))
+            print('{:<24}{}'.format('', pool.stats()))
+
+
+if __name__ == '__main__':
+    main()
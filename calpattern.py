@@ -44,12 +44,41 @@
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
 import numpy as np
 from time import sleep
-import antarray
+import warnings
+import arrayfactor
+import arraygeometry
+import adaptive
+from dbkernel import DbKernel
+import coupling
+import directsum
+import elementpattern
+import fftbackend
+import incremental
+import montecarlo
+import multibeam
+import patternfile
+import positionerror
+import tolerance
+from resample import AngleResampler
+import wideband
+from workspace import WorkspacePool
+import workspace
 
 
 class CalPattern(QObject):
     patternReady = pyqtSignal(np.ndarray, np.ndarray,
                               np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+    # frequency, azimuth, elevation, pattern, squint azimuth and elevation
+    widebandReady = pyqtSignal(np.ndarray, np.ndarray, np.ndarray,
+                               np.ndarray, np.ndarray, np.ndarray)
+    # azimuth, elevation, (B, ...) patterns, beam azimuths and elevations,
+    # crossover levels of adjacent beams
+    multibeamReady = pyqtSignal(np.ndarray, np.ndarray, np.ndarray,
+                                np.ndarray, np.ndarray, np.ndarray)
+    # azimuth, elevation, sum / azimuth / elevation difference patterns,
+    # azimuth and elevation monopulse slopes and null depths
+    monopulseReady = pyqtSignal(np.ndarray, np.ndarray, np.ndarray,
+                                np.ndarray, np.ndarray)
     new_data = False
 
     def __init__(self):
@@ -59,14 +88,20 @@ class CalPattern(QObject):
             1: 'Chebyshev',
             2: 'Taylor',
             3: 'Hamming',
-            4: 'Hanning'
+            4: 'Hanning',
+            5: 'Bayliss'
         }
         self.sizex = 64
         self.sizey = 1
         self.spacingx = 0.5
         self.spacingy = 0.5
-        self.rect_array = antarray.RectArray(
+        self.x, self.y = arraygeometry.rect_positions(
             self.sizex, self.sizey, self.spacingx, self.spacingy)
+        # arbitrary element positions (λ) and complex tapers, these replace
+        # the rectangular grid when set
+        self.element_x = None
+        self.element_y = None
+        self.element_weight = None
         self.beam_az = 0
         self.beam_el = 0
         self.u = np.linspace(-1, 1, num=101, endpoint=True)
@@ -79,12 +114,46 @@ class CalPattern(QObject):
         self.nbary = 20
         self.new_data = False
         self.plot = 'Cartesian'
+        self.uniform_angle = False
+        self.resampler = AngleResampler()
+        self.precision = 'single'
+        self.floor_db = -100
+        self.normalize = False
+        self.db_kernel = DbKernel()
+        self.pool = WorkspacePool()
+        # (sizex, sizey) bool mask of the active elements of the
+        # rectangular grid, None for a full grid
+        self.mask = None
+        self.custom_mask = None
+        self.fill = 1.0
+        self.fill_seed = 0
+        self.fft_config = (fftbackend.default_backend(),
+                           fftbackend.default_threads())
+        self.fft_backend = fftbackend.get_backend(*self.fft_config)
+        # measured element gain (theta, dB) for the 'table' model
+        self.element_table = None
+        self.element_config = ('isotropic', {})
+        self.element = elementpattern.ElementPattern()
+        self.coupler = coupling.Coupling()
+        # measured (N, N) coupling matrix, used while N matches
+        self.coupling_matrix = None
+        self.coupling_serial = 0
+        self.coupling = False
+        self.coupling_model = {}
+        self.multibeam = False
+        self.beam_count = multibeam.BEAM_COUNT
+        self.beam_spacing = None
+        self.monopulse = False
+        self.diff_window = 5
 
     def update_config(self, linear_array_config):
+        self.config = dict(linear_array_config)
         self.sizex = linear_array_config.get('sizex', 64)
         self.sizey = linear_array_config.get('sizey', 32)
         self.spacingx = linear_array_config['spacingx']
         self.spacingy = linear_array_config.get('spacingy', 0.5)
+        self.x, self.y = arraygeometry.rect_positions(
+            self.sizex, self.sizey, self.spacingx, self.spacingy)
         self.beam_az = linear_array_config['beam_az']
         self.beam_el = linear_array_config.get('beam_el', 0)
         self.windowx = linear_array_config['windowx']
@@ -97,10 +166,676 @@ class CalPattern(QObject):
         self.nfft_el = linear_array_config.get('nfft_el')
         self.plot_az = linear_array_config.get('plot_az')
         self.plot_el = linear_array_config.get('plot_el')
+        self.nufft_eps = linear_array_config.get('nufft_eps', 1e-6)
+        # 'fft' (FFT/NUFFT) or 'direct' (chunked direct summation)
+        self.backend = linear_array_config.get('backend', 'fft')
+        self.threads = linear_array_config.get('threads', 1)
+        self.max_bytes = linear_array_config.get(
+            'max_bytes', directsum.MAX_BYTES)
+        self.uniform_angle = linear_array_config.get('uniform_angle', False)
+        # (min, max) angle in degrees of a zoomed axis, None for full view
+        self.zoom_az = linear_array_config.get('zoom_az')
+        self.zoom_el = linear_array_config.get('zoom_el')
+        # adaptive sampling of cuts, tolerance in dB
+        self.adaptive = linear_array_config.get('adaptive', False)
+        self.adaptive_tol = linear_array_config.get('adaptive_tol', 0.1)
+        # real transforms and mirrored output for real (unsteered) weights
+        self.symmetry = linear_array_config.get('symmetry', True)
+        # 'single' for interactive views, exports use compute('double')
+        self.precision = linear_array_config.get('precision', 'single')
+        # dB floor and normalization to the peak of the computed grid
+        self.floor_db = linear_array_config.get('floor_db', -100)
+        self.normalize = linear_array_config.get('normalize', False)
+        if self.db_kernel.threads != self.threads:
+            self.db_kernel = DbKernel(self.threads)
+        # 'numpy', 'scipy' or 'fftw', defaults from the environment
+        fft_config = (
+            linear_array_config.get(
+                'fft_backend', fftbackend.default_backend()),
+            linear_array_config.get(
+                'fft_threads', fftbackend.default_threads()))
+        if fft_config != self.fft_config:
+            self.fft_config = fft_config
+            self.fft_backend = fftbackend.get_backend(*fft_config)
+        # cap of the reused FFT scratch buffers
+        self.pool.resize(linear_array_config.get(
+            'workspace_bytes', workspace.MAX_BYTES))
+        # fraction of randomly chosen active elements of the grid
+        self.fill = linear_array_config.get('fill', 1.0)
+        self.fill_seed = linear_array_config.get('fill_seed', 0)
+        self.update_thinning()
+        # element pattern model and parameters, see elementpattern
+        self._set_element(
+            linear_array_config.get('element', 'isotropic'),
+            {'q': linear_array_config.get('element_q', 1.0),
+             'length': linear_array_config.get('element_length', 0.5),
+             'width': linear_array_config.get('element_width', 0.5),
+             'height': linear_array_config.get('element_height', 0.25)})
+        # effective weights C.w under mutual coupling, modelled from the
+        # element distances unless a measured matrix is set
+        self.coupling = linear_array_config.get('coupling', False)
+        self.coupling_model = {
+            'level_db': linear_array_config.get('coupling_db', -20),
+            'decay': linear_array_config.get('coupling_decay', 1.0),
+            'max_distance': linear_array_config.get('coupling_distance')}
+        # simultaneous beams fanned out around beam_az / beam_el, along
+        # elevation for elevation cuts, spacing in degrees or None for
+        # orthogonal beams
+        self.multibeam = linear_array_config.get('multibeam', False)
+        self.beam_count = linear_array_config.get(
+            'beam_count', multibeam.BEAM_COUNT)
+        self.beam_spacing = linear_array_config.get('beam_spacing')
+        # sum and difference channels, the difference window (index of
+        # win_type) shares the sidelobe settings of each axis
+        self.monopulse = linear_array_config.get('monopulse', False)
+        self.diff_window = linear_array_config.get('diff_window', 5)
+        # patterns over a band instead of a single frequency, spacings are
+        # in wavelengths at the centre frequency
+        self.wideband = linear_array_config.get('wideband', False)
+        self.freq_center = linear_array_config.get('freq_center', 10)
+        self.freq_bandwidth = linear_array_config.get('freq_bandwidth', 2)
+        self.freq_points = linear_array_config.get('freq_points', 33)
+        # 'phase' (phase shifters) or 'ttd' (true time delay)
+        self.steering = linear_array_config.get('steering', 'phase')
+        self.new_data = True
+
+    def update_thinning(self):
+        if self.custom_mask is not None and \
+                np.shape(self.custom_mask) == (self.sizex, self.sizey):
+            self.mask = self.custom_mask
+        elif self.fill < 1:
+            self.mask = arraygeometry.thinning_mask(
+                self.sizex, self.sizey, self.fill, self.fill_seed)
+        else:
+            self.mask = None
+
+    def update_mask(self, mask):
+        """Switch the rectangular grid to the active elements of a
+        (sizex, sizey) mask, it takes precedence over the fill setting while
+        the grid size matches."""
+        self.custom_mask = np.asarray(mask, dtype=bool)
+        self.update_thinning()
         self.new_data = True
-        self.rect_array.update_parameters(
-            sizex=self.sizex, sizey=self.sizey, spacingx=self.spacingx,
-            spacingy=self.spacingy)
+
+    def clear_mask(self):
+        self.custom_mask = None
+        self.update_thinning()
+        self.new_data = True
+
+    def update_element(self, model, params=None):
+        """Switch the element pattern, sampled grids are kept while the
+        model and parameters stay the same."""
+        if self._set_element(model, params):
+            self.new_data = True
+
+    def _set_element(self, model, params=None):
+        # swaps the element without releasing a frame, True on a change
+        params = params or {}
+        if (model, params) == self.element_config:
+            return False
+        self.element_config = (model, params)
+        if model == 'table' and self.element_table is None:
+            model = 'isotropic'
+        self.element = elementpattern.ElementPattern(
+            model, dict(params, table=self.element_table))
+        return True
+
+    def update_element_table(self, angle, gain):
+        """Measured element gain (dB) against theta (degrees from
+        broadside) for the 'table' model."""
+        self.element_table = (np.asarray(angle, dtype=float),
+                              np.asarray(gain, dtype=float))
+        model, params = self.element_config
+        self.element_config = (None, None)
+        self.update_element(model, params)
+
+    def update_coupling_matrix(self, matrix):
+        """Measured (N, N) coupling matrix of the raveled weights, it
+        replaces the model while N matches the active geometry."""
+        self.coupling_matrix = np.asarray(matrix, dtype=complex)
+        # keys the cached factorisation of this matrix
+        self.coupling_serial += 1
+        self.new_data = True
+
+    def clear_coupling_matrix(self):
+        self.coupling_matrix = None
+        self.new_data = True
+
+    def measured_coupling(self, x):
+        return self.coupling_matrix is not None and \
+            np.shape(self.coupling_matrix) == (np.size(x),) * 2
+
+    def coupled(self, x, y, weight):
+        """Effective weights C.w, masked elements stay off. A (B, ...)
+        ``weight`` holds a batch of weight sets."""
+        if self.measured_coupling(x):
+            weight = self.coupler.dense(self.coupling_matrix, weight)
+        elif not self.coupling:
+            return weight
+        elif self.element_x is None:
+            weight = self.coupler.grid(
+                weight, self.spacingx, self.spacingy, self.coupling_model)
+        else:
+            try:
+                matrix = self.coupler.matrix(x, y, self.coupling_model)[0]
+            except ValueError as error:
+                # too many elements for a dense matrix, leave uncoupled
+                warnings.warn(str(error))
+                return weight
+            weight = self.coupler.dense(matrix, weight)
+        if self.mask is not None and self.element_x is None:
+            weight *= self.mask
+        return weight
+
+    def decoupled_weights(self, precision=None):
+        """Element excitations that give the ideal weights after coupling,
+        the LU factorisation is cached per geometry."""
+        x, y, weight = self.array_weights(precision, coupled=False)
+        if self.measured_coupling(x):
+            key = ('measured', self.coupling_serial)
+            matrix = self.coupling_matrix
+        elif self.coupling:
+            try:
+                matrix, key = self.coupler.matrix(
+                    x, y, self.coupling_model)
+            except ValueError as error:
+                warnings.warn(str(error))
+                return x, y, weight
+        else:
+            return x, y, weight
+        return x, y, self.coupler.decouple(matrix, weight, key)
+
+    def update_elements(self, x, y, weight=None):
+        if weight is None:
+            weight = np.ones(np.shape(x))
+        self.element_x = np.asarray(x, dtype=float)
+        self.element_y = np.asarray(y, dtype=float)
+        self.element_weight = np.asarray(weight, dtype=complex)
+        self.new_data = True
+
+    def clear_elements(self):
+        self.element_x = None
+        self.element_y = None
+        self.element_weight = None
+        self.new_data = True
+
+    def array_weights(self, precision=None, coupled=True, steered=True):
+        """Element positions and steered weights of the active geometry,
+        weights of the rectangular grid keep their (sizex, sizey) shape.
+        ``coupled`` gives the effective weights under mutual coupling,
+        ``steered`` False the tapers alone."""
+        if (precision or self.precision) == 'double':
+            dtype = np.float64
+        else:
+            dtype = np.float32
+        cdtype = arrayfactor.complex_dtype(dtype)
+
+        if self.element_x is None:
+            weight = arrayfactor.rect_weights(
+                self.sizex, self.sizey,
+                windowx=self.win_type[self.windowx], sllx=self.sllx,
+                nbarx=self.nbarx,
+                windowy=self.win_type[self.windowy], slly=self.slly,
+                nbary=self.nbary, dtype=dtype).astype(cdtype)
+            if steered:
+                weight *= arrayfactor.steering(
+                    self.x, self.y, self.beam_az, self.beam_el,
+                    cdtype).reshape(self.sizex, self.sizey)
+            if self.mask is not None:
+                weight *= self.mask
+            if coupled:
+                weight = self.coupled(self.x, self.y, weight)
+            return self.x, self.y, weight
+
+        weight = self.element_weight.astype(cdtype)
+        if steered:
+            weight *= arrayfactor.steering(
+                self.element_x, self.element_y, self.beam_az, self.beam_el,
+                cdtype)
+        if coupled:
+            weight = self.coupled(self.element_x, self.element_y, weight)
+        return self.element_x, self.element_y, weight
+
+    def active_elements(self, x, y, weight):
+        """Positions and raveled weights of the elements switched on by
+        the mask."""
+        if self.mask is None or self.element_x is not None:
+            return x, y, np.ravel(weight)
+        active = self.mask.ravel()
+        return x[active], y[active], np.ravel(weight)[active]
+
+    def sparse(self):
+        """True if the thinned grid is cheaper to sum directly."""
+        return self.mask is not None and self.element_x is None and \
+            arrayfactor.prefer_direct(
+                np.count_nonzero(self.mask), self.sizex, self.sizey,
+                self.spacingx, self.spacingy, self.nfft_az, self.nfft_el)
+
+    def array_pattern(self, x, y, weight):
+        if self.backend == 'direct' or self.sparse():
+            # zero weights of masked elements are dropped from the sum
+            x, y, weight = self.active_elements(x, y, weight)
+            return arrayfactor.direct_pattern(
+                x, y, weight, self.nfft_az, self.nfft_el, self.plot_az,
+                self.plot_el, self.threads, self.max_bytes, self.zoom_az,
+                self.zoom_el)
+        elif self.element_x is None:
+            return arrayfactor.fft_pattern(
+                weight, self.spacingx, self.spacingy, self.nfft_az,
+                self.nfft_el, self.plot_az, self.plot_el, self.zoom_az,
+                self.zoom_el, self.pool, self.fft_backend)
+        else:
+            return arrayfactor.nufft_pattern(
+                x, y, weight, self.nfft_az, self.nfft_el, self.plot_az,
+                self.plot_el, self.nufft_eps, self.zoom_az, self.zoom_el,
+                self.fft_backend)
+
+    def adaptive_pattern(self, x, y, weight):
+        """Adaptively sampled cut in dB, refined around nulls and lobe
+        edges."""
+        weight = np.ravel(weight)
+        norm = max(np.sum(np.abs(weight)), np.finfo(float).tiny)
+        if self.nfft_az > 1:
+            angle_range = self.zoom_az or (-90, 90)
+            elevation = np.array([self.plot_el], dtype=float)
+
+            def evaluate(angle):
+                return self.element_db(self.db_kernel(directsum.array_factor(
+                    x, y, weight, angle, self.plot_el, self.threads,
+                    self.max_bytes), floor=-300, scale=1 / norm ** 2),
+                    angle, elevation)
+        else:
+            angle_range = self.zoom_el or (-90, 90)
+            azimuth = np.array([self.plot_az], dtype=float)
+
+            def evaluate(angle):
+                return self.element_db(self.db_kernel(directsum.array_factor(
+                    x, y, weight, self.plot_az, angle, self.threads,
+                    self.max_bytes), floor=-300, scale=1 / norm ** 2),
+                    azimuth, angle)
+
+        angle, AF = adaptive.refine(
+            evaluate, np.linspace(angle_range[0], angle_range[1], 361),
+            tol=self.adaptive_tol)
+        if self.nfft_az > 1:
+            return angle, elevation, AF
+        return azimuth, angle, AF
+
+    def element_db(self, pattern, azimuth, elevation, floor=-300):
+        """Element gain added to a dB cut at angles that change every
+        call, sampled without the grid cache."""
+        if self.element.isotropic:
+            return pattern
+        with np.errstate(divide='ignore'):
+            pattern += 20 * np.log10(elementpattern.element_field(
+                self.element.model, azimuth, elevation,
+                self.element.params)).ravel().astype(pattern.dtype)
+        return np.maximum(pattern, floor, out=pattern)
+
+    def db_pattern(self, x, y, weight):
+        if self.symmetry and self.element_x is None and \
+                self.backend == 'fft' and not self.uniform_angle and \
+                not self.normalize and not self.sparse() and \
+                self.zoom_az is None and self.zoom_el is None:
+            result = arrayfactor.symmetric_pattern_db(
+                weight, self.spacingx, self.spacingy, self.nfft_az,
+                self.nfft_el, self.plot_az, self.plot_el, self.floor_db,
+                self.db_kernel, self.pool, self.fft_backend)
+            if result is not None:
+                self.element.apply_db(result[2], *result[:2],
+                                      floor=self.floor_db)
+                return result
+
+        azimuth, elevation, AF = self.array_pattern(x, y, weight)
+        self.element.apply(AF, azimuth, elevation)
+
+        if self.uniform_angle:
+            power = self.db_kernel.power(AF)
+            azimuth, power = self.resampler.resample(azimuth, power, 0)
+            elevation, power = self.resampler.resample(elevation, power, 1)
+            return azimuth, elevation, self.db_kernel.db(
+                power, power, self.floor_db, self.normalize)
+
+        return azimuth, elevation, self.db_kernel(
+            AF, floor=self.floor_db, normalize=self.normalize)
+
+    def incremental(self, refresh=incremental.REFRESH):
+        """IncrementalPattern of the current configuration in double
+        precision, indices follow the raveled weights of array_weights().
+        Masked elements of a thinned grid stay in the sum with zero weight
+        so they can be switched on."""
+        x, y, weight = self.array_weights('double')
+        shape = np.shape(weight)
+
+        def full(weight):
+            weight = weight.reshape(shape)
+            if self.backend == 'direct':
+                return arrayfactor.direct_pattern(
+                    x, y, weight, self.nfft_az, self.nfft_el, self.plot_az,
+                    self.plot_el, self.threads, self.max_bytes,
+                    self.zoom_az, self.zoom_el)
+            elif self.element_x is None:
+                return arrayfactor.fft_pattern(
+                    weight, self.spacingx, self.spacingy, self.nfft_az,
+                    self.nfft_el, self.plot_az, self.plot_el, self.zoom_az,
+                    self.zoom_el, self.pool, self.fft_backend)
+            return arrayfactor.nufft_pattern(
+                x, y, weight, self.nfft_az, self.nfft_el, self.plot_az,
+                self.plot_el, self.nufft_eps, self.zoom_az, self.zoom_el,
+                self.fft_backend)
+
+        return incremental.IncrementalPattern(x, y, weight, full, refresh)
+
+    def failure_analysis(self, rate, trials, seed=0, workers=None,
+                         bin_width=montecarlo.BIN_WIDTH, precision=None):
+        """Monte Carlo pattern statistics of the current configuration with
+        each element failing with probability ``rate``, see
+        montecarlo.failure_analysis(). Cuts are returned with shape
+        (n, 1) or (1, n) like the computed grid."""
+        x, y, weight = self.array_weights(precision)
+        grid = None
+        if self.element_x is None:
+            grid = (self.spacingx, self.spacingy)
+        return montecarlo.failure_analysis(
+            x, y, weight, rate, trials, self.nfft_az, self.nfft_el,
+            self.plot_az, self.plot_el, self.zoom_az, self.zoom_el, grid,
+            self.floor_db, bin_width, seed, workers or self.threads)
+
+    def position_analysis(self, sigma, trials, distribution='normal',
+                          seed=0, workers=None, precision=None):
+        """Pattern statistics of the current configuration under random
+        element position errors (λ), see positionerror.position_analysis().
+        Grids and elements are both evaluated at the perturbed positions
+        with the configured backend."""
+        x, y, weight = self.active_elements(*self.array_weights(precision))
+        if self.backend == 'direct':
+            method = 'direct'
+        else:
+            method = 'nufft'
+        return positionerror.position_analysis(
+            x, y, weight, sigma, trials, self.nfft_az, self.nfft_el,
+            self.plot_az, self.plot_el, self.zoom_az, self.zoom_el,
+            distribution, method, self.nufft_eps, self.floor_db, seed,
+            workers or self.threads)
+
+    def tolerance_analysis(self, trials, phase_bits=None, step_db=None,
+                           range_db=None, amplitude_db=0, phase_deg=0,
+                           seed=0, precision=None):
+        """Quantization and random error statistics of the current
+        configuration, see tolerance.tolerance_analysis()."""
+        x, y, weight = self.array_weights(precision)
+        grid = None
+        if self.element_x is None:
+            grid = (self.spacingx, self.spacingy)
+        return tolerance.tolerance_analysis(
+            x, y, weight, trials, self.nfft_az, self.nfft_el, self.plot_az,
+            self.plot_el, self.zoom_az, self.zoom_el, grid, phase_bits,
+            step_db, range_db, amplitude_db, phase_deg, self.floor_db, seed)
+
+    def compute_wideband(self, precision=None):
+        """Frequency, azimuth, elevation, the (F, P, Q) dB patterns over
+        the band and the squinted beam azimuth and elevation per frequency,
+        see wideband.wideband_pattern(). Angle axes are uniform in degrees.
+        """
+        x, y, weight = self.array_weights(precision)
+        frequency = wideband.frequencies(
+            self.freq_center, self.freq_bandwidth, self.freq_points)
+        azimuth = wideband.angle_axis(self.nfft_az, self.zoom_az,
+                                      self.plot_az)
+        elevation = wideband.angle_axis(self.nfft_el, self.zoom_el,
+                                        self.plot_el)
+        grid = None
+        if self.element_x is None:
+            grid = (self.spacingx, self.spacingy)
+        AF = wideband.wideband_pattern(
+            x, y, weight, frequency, self.freq_center, azimuth, elevation,
+            self.beam_az, self.beam_el, self.steering, grid, self.threads,
+            self.max_bytes)
+        # element pattern at the centre frequency over the whole band
+        self.element.apply(AF, azimuth, elevation)
+        pattern = self.db_kernel(
+            AF, floor=self.floor_db, normalize=self.normalize)
+        return (frequency, azimuth, elevation, pattern) + wideband.squint(
+            azimuth, elevation, pattern)
+
+    def beam_angles(self):
+        """Azimuths and elevations (degrees) of the simultaneous beams."""
+        along_el = self.nfft_az == 1
+        if self.element_x is None:
+            length = self.sizey * self.spacingy if along_el else \
+                self.sizex * self.spacingx
+        else:
+            length = np.ptp(self.element_y if along_el else self.element_x)
+        center = self.beam_el if along_el else self.beam_az
+        angle = multibeam.beam_angles(
+            center, self.beam_count, self.beam_spacing, length)
+        other = np.full(np.shape(angle), self.beam_az if along_el else
+                        self.beam_el)
+        if along_el:
+            return other, angle
+        return angle, other
+
+    def beam_weights(self, precision=None):
+        """Element positions, beam angles and the (B, ...) stack of the
+        steered weights of all beams, sharing the taper and geometry."""
+        x, y, taper = self.array_weights(
+            precision, coupled=False, steered=False)
+        beam_az, beam_el = self.beam_angles()
+        weight = taper * multibeam.steering_stack(
+            x, y, beam_az, beam_el, taper.dtype).reshape(
+                (-1,) + np.shape(taper))
+        return x, y, beam_az, beam_el, self.coupled(x, y, weight)
+
+    def beam_passes(self, x, y, weight):
+        """(start, azimuth, elevation, AF) of consecutive beams of a
+        (B, ...) weight stack. Grids are transformed in batched passes of
+        as many beams as keep the FFT buffers in cache, other geometries
+        beam by beam."""
+        if self.backend == 'fft' and self.element_x is None and \
+                not self.sparse():
+            size = self.nfft_az * self.nfft_el * weight.itemsize
+            step = max(1, multibeam.PASS_BYTES // size)
+            for start in range(0, np.shape(weight)[0], step):
+                yield (start,) + arrayfactor.fft_pattern(
+                    weight[start:start + step], self.spacingx,
+                    self.spacingy, self.nfft_az, self.nfft_el, self.plot_az,
+                    self.plot_el, self.zoom_az, self.zoom_el, self.pool,
+                    self.fft_backend)
+        else:
+            for start, beam in enumerate(weight):
+                azimuth, elevation, AF = self.array_pattern(x, y, beam)
+                yield start, azimuth, elevation, AF[np.newaxis]
+
+    def stack_power(self, x, y, weight):
+        """Axes and (B, P, Q) normalized power patterns of a (B, ...)
+        weight stack, element pattern included."""
+        power = None
+        for start, azimuth, elevation, AF in self.beam_passes(x, y, weight):
+            self.element.apply(AF, azimuth, elevation)
+            if power is None:
+                power = np.empty((np.shape(weight)[0],) + np.shape(AF)[1:],
+                                 dtype=np.finfo(AF.dtype).dtype)
+            self.db_kernel.power(AF, power[start:start + np.shape(AF)[0]])
+
+        if self.uniform_angle:
+            azimuth, power = self.resampler.resample(azimuth, power, 1)
+            elevation, power = self.resampler.resample(elevation, power, 2)
+        return azimuth, elevation, power
+
+    def compute_multibeam(self, precision=None):
+        """Axes, (B, P, Q) dB patterns of the simultaneous beams, (B, P)
+        for cuts, beam angles and the crossover levels of adjacent beams.
+        """
+        x, y, beam_az, beam_el, weight = self.beam_weights(precision)
+        azimuth, elevation, power = self.stack_power(x, y, weight)
+        pattern = self.db_kernel.db(
+            power, power, self.floor_db, self.normalize)
+
+        # crossovers along the fan, through the beams on 2D grids
+        if self.nfft_az == 1:
+            angle, beams = elevation, beam_el
+            cut = pattern[:, 0, :]
+        else:
+            angle, beams = azimuth, beam_az
+            cut = pattern[:, :, np.argmin(np.abs(elevation - beam_el[0]))]
+        levels = multibeam.crossover(angle, cut, beams)
+        if self.nfft_az == 1 or self.nfft_el == 1:
+            pattern = pattern.reshape(np.shape(pattern)[0], -1)
+        return azimuth, elevation, pattern, beam_az, beam_el, levels
+
+    def monopulse_weights(self, precision=None):
+        """Element positions and the (3, ...) stack of the steered sum,
+        azimuth and elevation difference weights. Grids use the difference
+        window along the split axis, other geometries split the sum
+        weights into antiphase halves."""
+        x, y, weight = self.array_weights(
+            precision, coupled=False, steered=False)
+        if self.element_x is None:
+            window = self.win_type[self.diff_window]
+            difference = [np.outer(
+                arrayfactor.difference_taper(
+                    self.sizex, window, self.sllx, self.nbarx),
+                arrayfactor.taper(
+                    self.sizey, self.win_type[self.windowy], self.slly,
+                    self.nbary)),
+                np.outer(
+                arrayfactor.taper(
+                    self.sizex, self.win_type[self.windowx], self.sllx,
+                    self.nbarx),
+                arrayfactor.difference_taper(
+                    self.sizey, window, self.slly, self.nbary))]
+            if self.mask is not None:
+                difference = [taper * self.mask for taper in difference]
+        else:
+            difference = [weight * np.sign(x - np.mean(x)),
+                          weight * np.sign(y - np.mean(y))]
+        weight = np.stack([weight] + difference).astype(weight.dtype)
+        weight *= arrayfactor.steering(
+            x, y, self.beam_az, self.beam_el, weight.dtype).reshape(
+                np.shape(weight)[1:])
+        return x, y, self.coupled(x, y, weight)
+
+    def monopulse_metrics(self, x, y, weight, step=0.01):
+        """Slopes (1/degree) of the azimuth and elevation monopulse
+        ratios at the beam and their null depths (dB), the difference
+        relative to the sum there. Channels are normalized to unit
+        power."""
+        # masked elements have zero weight in every channel
+        weight = np.reshape(np.asarray(weight, dtype=complex), (3, -1)).T
+        power = np.sqrt(np.sum(np.abs(weight) ** 2, axis=0))
+        weight = weight / np.where(power > 0, power, 1)
+        azimuth = self.beam_az + np.array([0, -step, step, 0, 0])
+        elevation = self.beam_el + np.array([0, 0, 0, -step, step])
+        AF = directsum.array_factor(
+            x, y, weight, azimuth, elevation, self.threads, self.max_bytes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = AF[:, 1:] / AF[:, :1]
+            slope = np.abs(np.array([ratio[2, 0] - ratio[1, 0],
+                                     ratio[4, 1] - ratio[3, 1]])) / (2 * step)
+            depth = 20 * np.log10(np.abs(ratio[0]))
+        return slope, np.maximum(depth, self.floor_db)
+
+    def compute_monopulse(self, precision=None):
+        """Axes, (3, P, Q) dB sum, azimuth and elevation difference
+        patterns, (3, P) for cuts, and the slopes and null depths of
+        monopulse_metrics(). All channels go through one batched pass and
+        are scaled to unit power, the sum peaks at 0 dB at the beam."""
+        x, y, weight = self.monopulse_weights(precision)
+        azimuth, elevation, power = self.stack_power(x, y, weight)
+        # undo the sum(|w|) normalization of each channel
+        amplitude = np.sum(np.abs(weight), axis=tuple(
+            range(1, np.ndim(weight))))
+        energy = np.sum(np.abs(weight) ** 2, axis=tuple(
+            range(1, np.ndim(weight))))
+        scale = amplitude ** 2 / np.where(energy > 0, energy, 1) * \
+            energy[0] / max(amplitude[0] ** 2, np.finfo(float).tiny)
+        power *= scale.reshape((-1,) + (1,) * (np.ndim(power) - 1)).astype(
+            power.dtype)
+        pattern = self.db_kernel.db(power, power, self.floor_db)
+        if self.nfft_az == 1 or self.nfft_el == 1:
+            pattern = pattern.reshape(np.shape(pattern)[0], -1)
+        return (azimuth, elevation, pattern) + self.monopulse_metrics(
+            x, y, weight)
+
+    def workspace_stats(self):
+        """Buffer count, size and hit/miss/eviction counts of the FFT
+        workspace pool."""
+        return self.pool.stats()
+
+    def cal_points(self, azimuth, elevation):
+        """Normalized array factor at arbitrary angles (degrees)."""
+        x, y, weight = self.array_weights()
+        weight = np.ravel(weight)
+        AF = directsum.array_factor(
+            x, y, weight, azimuth, elevation, self.threads, self.max_bytes)
+        return AF / max(np.sum(np.abs(weight)), np.finfo(float).tiny)
+
+    def compute(self, precision=None):
+        """Pattern (dB) of the current configuration, ``precision`` is
+        'single' or 'double' and defaults to the configured one."""
+        x, y, weight = self.array_weights(precision)
+        cut = self.nfft_az == 1 or self.nfft_el == 1
+        if self.adaptive and cut:
+            azimuth, elevation, AF = self.adaptive_pattern(
+                *self.active_elements(x, y, weight))
+        else:
+            azimuth, elevation, AF = self.db_pattern(x, y, weight)
+        if cut:
+            AF = AF.ravel()
+        # only active elements are plotted and exported
+        return (azimuth, elevation, AF) + self.active_elements(x, y, weight)
+
+    def pattern_tiles(self, nfft_az, nfft_el, rows, precision='double'):
+        """Axes and (start, AF) azimuth row tiles of the normalized array
+        factor on a nfft_az x nfft_el grid (both > 1)."""
+        x, y, weight = self.array_weights(precision)
+        if self.backend == 'direct':
+            x, y, weight = self.active_elements(x, y, weight)
+            return arrayfactor.direct_pattern_tiles(
+                x, y, weight, nfft_az, nfft_el, rows, self.threads,
+                self.max_bytes, self.zoom_az, self.zoom_el)
+        elif self.element_x is None:
+            return arrayfactor.fft_pattern_tiles(
+                weight, self.spacingx, self.spacingy, nfft_az, nfft_el, rows,
+                self.zoom_az, self.zoom_el, self.pool, self.fft_backend)
+        else:
+            return arrayfactor.nufft_pattern_tiles(
+                x, y, weight, nfft_az, nfft_el, rows, self.nufft_eps,
+                self.zoom_az, self.zoom_el, self.fft_backend)
+
+    def export_map(self, path, nfft_az, nfft_el, rows=None,
+                   dtype=np.float32, progress=None):
+        """Compute the dB pattern on a nfft_az x nfft_el grid tile by tile
+        straight into a memory-mapped .npy file, see patternfile.load().
+
+        ``rows`` azimuths are computed at a time, by default as many as fit
+        in max_bytes, so the working set does not grow with the grid.
+        ``progress(done, total)`` is called after every tile, returning
+        False stops the export, removes the files and returns None.
+        """
+        if nfft_az < 2 or nfft_el < 2:
+            raise ValueError('Memory-mapped export needs a 2D grid')
+        rows = rows or max(1, self.max_bytes // (nfft_el * 64))
+        azimuth, elevation, tiles = self.pattern_tiles(
+            nfft_az, nfft_el, rows)
+        config = dict(self.config, nfft_az=nfft_az, nfft_el=nfft_el)
+        pattern = patternfile.create(
+            path, azimuth, elevation, dtype, config)
+        for start, AF in tiles:
+            stop = start + np.shape(AF)[0]
+            if not self.element.isotropic:
+                # tiles are visited once, not worth caching
+                AF *= elementpattern.element_field(
+                    self.element.model, azimuth[start:stop], elevation,
+                    self.element.params).astype(np.finfo(AF.dtype).dtype)
+            self.db_kernel(AF, pattern[start:stop], floor=self.floor_db)
+            if progress is not None and \
+                    not progress(stop, np.shape(pattern)[0]):
+                del pattern
+                patternfile.remove(path)
+                return None
+        pattern.flush()
+        return azimuth, elevation, pattern
 
     @pyqtSlot()
     def cal_pattern(self):
@@ -108,28 +843,13 @@ class CalPattern(QObject):
             if self.new_data:
                 self.new_data = False
 
-                AF_data = self.rect_array.get_pattern(
-                    nfft_az=self.nfft_az,
-                    nfft_el=self.nfft_el,
-                    beam_az=self.beam_az,
-                    beam_el=self.beam_el,
-                    windowx=self.win_type[self.windowx],
-                    sllx=self.sllx,
-                    nbarx=self.nbarx,
-                    windowy=self.win_type[self.windowy],
-                    slly=self.slly,
-                    nbary=self.nbary,
-                    plot_az=self.plot_az,
-                    plot_el=self.plot_el
-                )
-
-                AF = 20 * np.log10(np.abs(AF_data['array_factor']) + 0.00001)
-
-                x = self.rect_array.x
-                y = self.rect_array.y
-                weight = AF_data['weight'].ravel()
-
-                self.patternReady.emit(
-                    AF_data['azimuth'], AF_data['elevation'], AF, x, y, weight)
+                if self.wideband:
+                    self.widebandReady.emit(*self.compute_wideband())
+                elif self.multibeam:
+                    self.multibeamReady.emit(*self.compute_multibeam())
+                elif self.monopulse:
+                    self.monopulseReady.emit(*self.compute_monopulse())
+                else:
+                    self.patternReady.emit(*self.compute())
 
             sleep(0.01)
@@ -0,0 +1,222 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from collections import OrderedDict
+import threading
+
+import numpy as np
+from scipy.fft import next_fast_len
+from scipy.linalg import lu_factor, lu_solve
+from scipy import sparse
+from scipy.sparse.linalg import splu
+from scipy.spatial import cKDTree
+import fftbackend
+
+# distance (λ) at which neighbours couple with the model level
+REFERENCE = 0.5
+# geometries kept per cache
+MAX_GEOMETRIES = 8
+# largest element count with a dense coupling matrix, beyond it the model
+# needs a max_distance and the matrix is sparse
+MAX_DENSE = 2048
+
+
+def coupling_coefficient(distance, level_db=-20, decay=1.0,
+                         max_distance=None):
+    """Mutual coupling between two elements ``distance`` (λ) apart.
+
+    ``level_db`` is the coupling at REFERENCE, it falls as
+    (REFERENCE / r)^decay with the free-space phase delay and is cut off
+    beyond ``max_distance``. Self coupling is 1.
+    """
+    distance = np.asarray(distance, dtype=float)
+    with np.errstate(divide='ignore'):
+        coefficient = 10 ** (level_db / 20) * (
+            REFERENCE / distance) ** decay * np.exp(
+                -1j * 2 * np.pi * (distance - REFERENCE))
+    coefficient[distance == 0] = 1
+    if max_distance is not None:
+        coefficient[distance > max_distance] = 0
+    return coefficient
+
+
+def coupling_kernel(sizex, sizey, spacingx, spacingy, **model):
+    """(2 sizex - 1, 2 sizey - 1) coupling over the element offsets of a
+    regular grid, offset (dm, dn) is at index (dm % rows, dn % columns).
+    The coupling matrix of the grid is block Toeplitz with Toeplitz
+    blocks built from it."""
+    dm = np.fft.ifftshift(np.arange(-(sizex - 1), sizex))
+    dn = np.fft.ifftshift(np.arange(-(sizey - 1), sizey))
+    distance = np.hypot(dm[:, np.newaxis] * spacingx,
+                        dn[np.newaxis, :] * spacingy)
+    return coupling_coefficient(distance, **model)
+
+
+def coupling_matrix(x, y, **model):
+    """(N, N) coupling matrix of the elements at ``x``, ``y``, dense up to
+    MAX_DENSE elements. Larger arrays get a sparse matrix of the pairs
+    within ``max_distance`` found by a neighbour search, without it they
+    raise ValueError."""
+    x = np.ravel(x)
+    y = np.ravel(y)
+    if np.size(x) > MAX_DENSE:
+        if model.get('max_distance') is None:
+            raise ValueError(
+                'Coupling of {} elements needs a max_distance'.format(
+                    np.size(x)))
+        points = cKDTree(np.column_stack((x, y)))
+        pairs = points.sparse_distance_matrix(
+            points, model['max_distance'], output_type='coo_matrix')
+        # self coupling on the diagonal, whether or not the search kept it
+        other = pairs.row != pairs.col
+        return (sparse.csr_matrix((coupling_coefficient(
+            pairs.data[other], **model), (pairs.row[other],
+                                          pairs.col[other])),
+            shape=pairs.shape) + sparse.identity(
+                np.size(x), dtype=complex, format='csr'))
+    return coupling_coefficient(np.hypot(
+        x[:, np.newaxis] - x[np.newaxis, :],
+        y[:, np.newaxis] - y[np.newaxis, :]), **model)
+
+
+class Coupling(object):
+    """Effective weights C.w under mutual coupling.
+
+    Regular grids are convolved with the coupling kernel by FFT in
+    O(N log N), the kernel spectrum is cached per geometry. Dense matrices
+    are applied as products, their LU factorisations for decoupling are
+    cached per matrix.
+    """
+
+    def __init__(self, max_geometries=MAX_GEOMETRIES, fft_backend=None):
+        self.max_geometries = max_geometries
+        self.fft_backend = fft_backend or fftbackend.numpy_fft
+        self.spectra = OrderedDict()
+        self.matrices = OrderedDict()
+        self.factors = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _cached(self, cache, key, build):
+        with self.lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = build()
+        with self.lock:
+            cache[key] = value
+            while len(cache) > self.max_geometries:
+                cache.popitem(last=False)
+        return value
+
+    def spectrum(self, sizex, sizey, spacingx, spacingy, model):
+        """FFT lengths and 2D spectrum of the grid coupling kernel."""
+        key = (sizex, sizey, spacingx, spacingy, tuple(sorted(model.items())))
+
+        def build():
+            kernel = coupling_kernel(sizex, sizey, spacingx, spacingy,
+                                     **model)
+            shape = (next_fast_len(2 * sizex - 1),
+                     next_fast_len(2 * sizey - 1))
+            padded = np.zeros(shape, dtype=complex)
+            # keep negative offsets at the end of each axis
+            rows = np.mod(np.fft.ifftshift(np.arange(-(sizex - 1), sizex)),
+                          shape[0])
+            columns = np.mod(np.fft.ifftshift(
+                np.arange(-(sizey - 1), sizey)), shape[1])
+            padded[np.ix_(rows, columns)] = kernel
+            return shape, self._fft2(padded)
+        return self._cached(self.spectra, key, build)
+
+    def _fft2(self, a, inverse=False):
+        transform = self.fft_backend.ifft if inverse else self.fft_backend.fft
+        a = transform(a, axis=-2, out=a)
+        return transform(a, axis=-1, out=a)
+
+    def grid(self, weight, spacingx, spacingy, model):
+        """C.w of a (sizex, sizey) weight grid by FFT convolution, or of a
+        (..., sizex, sizey) batch of grids."""
+        sizex, sizey = np.shape(weight)[-2:]
+        shape, spectrum = self.spectrum(
+            sizex, sizey, spacingx, spacingy, model)
+        padded = np.zeros(np.shape(weight)[:-2] + shape, dtype=complex)
+        padded[..., :sizex, :sizey] = weight
+        padded = self._fft2(padded)
+        padded *= spectrum
+        padded = self._fft2(padded, inverse=True)
+        return padded[..., :sizex, :sizey].astype(
+            np.result_type(weight.dtype, np.complex64))
+
+    def matrix(self, x, y, model):
+        """Coupling matrix of the elements at ``x``, ``y``, cached per
+        geometry, see coupling_matrix()."""
+        x = np.ascontiguousarray(x, dtype=float)
+        y = np.ascontiguousarray(y, dtype=float)
+        key = (np.size(x), hash(x.tobytes()), hash(y.tobytes()),
+               tuple(sorted(model.items())))
+        return self._cached(
+            self.matrices, key, lambda: coupling_matrix(x, y, **model)), key
+
+    def dense(self, matrix, weight):
+        """C.w of raveled weights with a dense or sparse matrix, or of a
+        (B, ...) batch of weight sets."""
+        shape = np.shape(weight)
+        weight = np.reshape(weight, (-1, np.shape(matrix)[0]))
+        return np.transpose(matrix @ np.transpose(weight)).reshape(
+            shape).astype(
+            np.result_type(weight.dtype, np.complex64), copy=False)
+
+    def decouple(self, matrix, weight, key=None):
+        """Excitation that gives ``weight`` after coupling, solved with the
+        LU factorisation cached under ``key`` (the matrix identity by
+        default)."""
+        key = key if key is not None else (id(matrix), np.shape(matrix))
+        if sparse.issparse(matrix):
+            factor = self._cached(
+                self.factors, key, lambda: splu(sparse.csc_matrix(matrix)))
+            solved = factor.solve(np.ravel(weight).astype(complex))
+        else:
+            factor = self._cached(
+                self.factors, key, lambda: lu_factor(np.asarray(matrix)))
+            solved = lu_solve(factor, np.ravel(weight))
+        return solved.reshape(np.shape(weight)).astype(
+            np.result_type(weight.dtype, np.complex64), copy=False)
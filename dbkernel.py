@@ -0,0 +1,167 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import numpy as np
+
+# Elements per row block, the squared imaginary part of one block is the
+# only scratch space and is kept per thread
+BLOCK_SIZE = 1 << 16
+
+
+class DbKernel:
+    """Fused |AF|^2 -> dB conversion into a preallocated buffer.
+
+    Computes 10 * log10(scale * (re^2 + im^2)) without the square root and
+    without full-size temporaries, clipped at ``floor`` dB and optionally
+    normalized to the peak. Large arrays are processed in row blocks on
+    ``threads`` threads.
+    """
+
+    def __init__(self, threads=1, block_size=BLOCK_SIZE):
+        self.threads = threads
+        self.block_size = block_size
+        self.local = threading.local()
+        self.pool = None
+
+    def _scratch(self, size, dtype):
+        scratch = getattr(self.local, 'scratch', None)
+        if scratch is None or scratch.dtype != dtype or \
+                np.shape(scratch)[0] < size:
+            scratch = np.empty(max(size, self.block_size), dtype=dtype)
+            self.local.scratch = scratch
+        return scratch[:size]
+
+    def _blocks(self, shape):
+        if len(shape) == 0:
+            return [Ellipsis]
+        row = int(np.prod(shape[1:]))
+        rows = max(1, self.block_size // max(row, 1))
+        return [slice(start, start + rows)
+                for start in range(0, shape[0], rows)]
+
+    def _map(self, func, blocks):
+        if self.threads > 1 and len(blocks) > 1:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.threads)
+            return list(self.pool.map(func, blocks))
+        return [func(block) for block in blocks]
+
+    def _power(self, AF, out, block, peak=False):
+        a = AF[block]
+        o = out[block]
+        np.multiply(a.real, a.real, out=o)
+        scratch = self._scratch(np.size(o), o.dtype).reshape(np.shape(o))
+        np.multiply(a.imag, a.imag, out=scratch)
+        np.add(o, scratch, out=o)
+        if peak:
+            return np.max(o) if np.size(o) else 0
+
+    def _db(self, out, block, floor_power, offset):
+        o = out[block]
+        # scalars in the output precision, no casting buffers
+        floor_power = o.dtype.type(floor_power)
+        offset = o.dtype.type(offset)
+        np.maximum(o, floor_power, out=o)
+        np.log10(o, out=o)
+        np.multiply(o, 10, out=o)
+        if offset:
+            np.add(o, offset, out=o)
+
+    def _output(self, AF, out):
+        if out is None:
+            out = np.empty(np.shape(AF), dtype=np.finfo(AF.dtype).dtype)
+        return out
+
+    def power(self, AF, out=None):
+        """|AF|^2 into ``out``."""
+        out = self._output(AF, out)
+        self._map(lambda block: self._power(AF, out, block),
+                  self._blocks(np.shape(AF)))
+        return out
+
+    def db(self, power, out=None, floor=-100, normalize=False, scale=1,
+           peak=None):
+        """Power to dB, ``out`` may be ``power`` itself."""
+        if out is None:
+            out = np.array(power, copy=True)
+        elif out is not power:
+            np.copyto(out, power)
+        blocks = self._blocks(np.shape(out))
+        if normalize:
+            peak = np.max(out) if peak is None else peak
+            offset = -10 * np.log10(peak) if peak > 0 else 0
+        else:
+            offset = 10 * np.log10(scale)
+        floor_power = np.power(10, (floor - offset) / 10)
+        self._map(lambda block: self._db(out, block, floor_power, offset),
+                  blocks)
+        return out
+
+    def __call__(self, AF, out=None, floor=-100, normalize=False, scale=1):
+        """10 * log10(scale * |AF|^2) of a complex array into ``out``."""
+        out = self._output(AF, out)
+        blocks = self._blocks(np.shape(AF))
+        if normalize:
+            peaks = self._map(
+                lambda block: self._power(AF, out, block, True), blocks)
+            return self.db(out, out, floor, True, peak=max(peaks))
+
+        offset = 10 * np.log10(scale)
+        floor_power = np.power(10, (floor - offset) / 10)
+
+        def fused(block):
+            self._power(AF, out, block)
+            self._db(out, block, floor_power, offset)
+
+        self._map(fused, blocks)
+        return out
+
+
+_kernel = DbKernel()
+
+
+def power_db(AF, out=None, floor=-100, normalize=False, scale=1):
+    """:meth:`DbKernel.__call__` on a shared single threaded kernel."""
+    return _kernel(AF, out, floor, normalize, scale)
@@ -0,0 +1,108 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Peak memory of the steering blocks, shared by all threads
+MAX_BYTES = 64 * 2 ** 20
+
+
+def chunk_size(num_elem, threads=1, max_bytes=MAX_BYTES, dtype=complex):
+    # real phase plus complex steering per (point, element)
+    term = 3 * np.dtype(dtype).itemsize // 2
+    return max(1, int(max_bytes // (threads * max(num_elem, 1) * term)))
+
+
+def array_factor(x, y, weight, azimuth, elevation, threads=1,
+                 max_bytes=MAX_BYTES):
+    """Exact array factor at arbitrary (azimuth, elevation) points.
+
+    The steering matrix is built in blocks of points so that at most
+    ``max_bytes`` are alive at once, and each block is reduced with a
+    matrix product against ``weight``. ``weight`` is (N,) or (N, B) for B
+    weight sets, the result has the broadcast shape of the angles plus the
+    trailing B axis. The precision follows ``weight``.
+    """
+    return array_factor_uv(
+        x, y, weight, np.sin(np.asarray(azimuth) / 180 * np.pi),
+        np.sin(np.asarray(elevation) / 180 * np.pi), threads, max_bytes)
+
+
+def array_factor_uv(x, y, weight, u, v, threads=1, max_bytes=MAX_BYTES):
+    """array_factor() at direction cosines (u, v), which may lie outside
+    the visible region."""
+    weight = np.asarray(weight)
+    dtype = np.result_type(weight.dtype, np.complex64)
+    real = np.finfo(dtype).dtype
+    weight = weight.astype(dtype, copy=False)
+    u, v = np.broadcast_arrays(u, v)
+    shape = np.shape(u) + np.shape(weight)[1:]
+
+    u = np.ravel(u).astype(real)
+    v = np.ravel(v).astype(real)
+    num_pts = np.shape(u)[0]
+    AF = np.empty((num_pts,) + np.shape(weight)[1:], dtype=dtype)
+
+    chunk = chunk_size(np.size(x), threads, max_bytes, dtype)
+    kx = (-2 * np.pi * np.ravel(x)).astype(real)
+    ky = (-2 * np.pi * np.ravel(y)).astype(real)
+
+    def block(start):
+        stop = min(start + chunk, num_pts)
+        phase = np.multiply.outer(u[start:stop], kx)
+        phase += np.multiply.outer(v[start:stop], ky)
+        steer = np.empty(np.shape(phase), dtype=dtype)
+        np.cos(phase, out=steer.real)
+        np.sin(phase, out=steer.imag)
+        np.matmul(steer, weight, out=AF[start:stop])
+
+    starts = range(0, num_pts, chunk)
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(block, starts))
+    else:
+        for start in starts:
+            block(start)
+
+    return AF.reshape(shape)
@@ -0,0 +1,162 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from collections import OrderedDict
+import threading
+
+import numpy as np
+
+MODELS = ('isotropic', 'cos', 'patch', 'dipole', 'table')
+# sampled angle grids kept per element pattern
+MAX_GRIDS = 8
+
+
+def direction_cosines(azimuth, elevation):
+    """(n_az, 1), (1, n_el) and (n_az, n_el) direction cosines of the
+    azimuth and elevation axes (degrees), the last one is cos(theta) from
+    broadside and zero outside the visible region."""
+    u = np.sin(np.asarray(azimuth, dtype=float) / 180 * np.pi)[:, np.newaxis]
+    v = np.sin(np.asarray(elevation, dtype=float) / 180 * np.pi)[
+        np.newaxis, :]
+    w = np.sqrt(np.maximum(1 - u * u - v * v, 0))
+    return u, v, w
+
+
+def element_field(model, azimuth, elevation, params=None):
+    """Field amplitude of one element on the azimuth x elevation grid,
+    relative to the fixed peak of the model so the gain holds on any grid.
+
+    'cos' is cos(theta)^q, 'patch' two radiating slots of a ``length`` x
+    ``width`` (λ) patch along x over a ground plane, 'dipole' a half wave
+    dipole along x at ``height`` (λ) over a ground plane (free space
+    for None) and 'table' the measured gain (dB) against theta (degrees
+    from broadside) of ``table``.
+    """
+    params = params or {}
+    u, v, w = direction_cosines(azimuth, elevation)
+    if model == 'cos':
+        field = w ** params.get('q', 1.0)
+    elif model == 'patch':
+        # cavity model, the obliquity factor only shapes the H-plane (y)
+        field = np.abs(np.cos(np.pi * params.get('length', 0.5) * u) *
+                       np.sinc(params.get('width', 0.5) * v)) * np.sqrt(
+                           np.maximum(1 - v * v, 0))
+    elif model == 'dipole':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            field = np.cos(np.pi / 2 * u) / np.sqrt(1 - u * u)
+        field = np.nan_to_num(field) * np.ones(np.shape(w))
+        height = params.get('height', 0.25)
+        if height:
+            # image in the ground plane, normalized to its peak over the
+            # hemisphere (broadside below λ/4)
+            peak = 1.0 if height >= 0.25 else np.sin(2 * np.pi * height)
+            field *= np.abs(np.sin(2 * np.pi * height * w)) / max(
+                peak, np.finfo(float).tiny)
+    elif model == 'table':
+        angle, gain = params['table']
+        theta = np.arccos(w) / np.pi * 180
+        field = 10 ** ((np.interp(theta, angle, gain) - np.max(gain)) / 20)
+    else:
+        return np.ones(np.shape(w))
+    field[w <= 0] = 0
+    return field
+
+
+class ElementPattern(object):
+    """Element pattern sampled once per angle grid.
+
+    The samples are cached by grid (axes and dtype) in a small LRU, so the
+    per-frame cost is one in-place multiply (linear) or add (dB).
+    """
+
+    def __init__(self, model='isotropic', params=None, max_grids=MAX_GRIDS):
+        self.model = model
+        self.params = params or {}
+        self.max_grids = max_grids
+        self.grids = OrderedDict()
+        self.lock = threading.Lock()
+
+    @property
+    def isotropic(self):
+        return self.model not in MODELS[1:]
+
+    def _grid(self, azimuth, elevation, dtype):
+        azimuth = np.ascontiguousarray(azimuth, dtype=float)
+        elevation = np.ascontiguousarray(elevation, dtype=float)
+        key = (np.size(azimuth), np.size(elevation), hash(azimuth.tobytes()),
+               hash(elevation.tobytes()), np.dtype(dtype).str)
+        with self.lock:
+            if key in self.grids:
+                self.grids.move_to_end(key)
+                return self.grids[key]
+        field = element_field(
+            self.model, azimuth, elevation, self.params).astype(dtype)
+        with np.errstate(divide='ignore'):
+            grid = (field, (20 * np.log10(field)).astype(dtype))
+        with self.lock:
+            self.grids[key] = grid
+            while len(self.grids) > self.max_grids:
+                self.grids.popitem(last=False)
+        return grid
+
+    def field(self, azimuth, elevation, dtype=np.float64):
+        return self._grid(azimuth, elevation, dtype)[0]
+
+    def gain_db(self, azimuth, elevation, dtype=np.float64):
+        return self._grid(azimuth, elevation, dtype)[1]
+
+    def apply(self, AF, azimuth, elevation):
+        """Multiply the (..., n_az, n_el) array factor in place."""
+        if not self.isotropic:
+            AF *= self.field(azimuth, elevation,
+                             np.finfo(AF.dtype).dtype).reshape(
+                                 np.shape(AF)[-2:])
+        return AF
+
+    def apply_db(self, pattern, azimuth, elevation, floor=-100):
+        """Add the gain to the (n_az, n_el) dB pattern in place."""
+        if not self.isotropic:
+            pattern += self.gain_db(
+                azimuth, elevation, pattern.dtype).reshape(np.shape(pattern))
+            np.maximum(pattern, floor, out=pattern)
+        return pattern
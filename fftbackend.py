@@ -0,0 +1,200 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from collections import OrderedDict
+import inspect
+import os
+import threading
+import numpy as np
+
+try:
+    import scipy.fft as scipy_fft
+except ImportError:
+    scipy_fft = None
+
+try:
+    import pyfftw
+    import pyfftw.builders
+except ImportError:
+    pyfftw = None
+
+# Defaults of the fft_backend / fft_threads config keys
+BACKEND_ENV = 'ARRAY_ANALYSIS_FFT_BACKEND'
+THREADS_ENV = 'ARRAY_ANALYSIS_FFT_THREADS'
+MAX_PLANS = 32
+# numpy.fft takes ``out`` from numpy 2.0 on
+NUMPY_OUT = 'out' in inspect.signature(np.fft.fft).parameters
+
+
+def default_backend():
+    return os.environ.get(BACKEND_ENV, 'numpy')
+
+
+def default_threads():
+    try:
+        return max(int(os.environ.get(THREADS_ENV, 1)), 1)
+    except ValueError:
+        return 1
+
+
+class NumpyFFT:
+    """numpy.fft, single threaded and without planning.
+
+    All backends share the signature of numpy.fft with ``out``, passing
+    the input as ``out`` transforms in place.
+    """
+
+    name = 'numpy'
+
+    def __init__(self, threads=1):
+        self.threads = threads
+
+    def _numpy(self, transform, a, n, axis, out):
+        if out is None or NUMPY_OUT:
+            return transform(a, n, axis, out=out)
+        # numpy 1.x, transform then copy into ``out``
+        out[...] = transform(a, n, axis)
+        return out
+
+    def fft(self, a, n=None, axis=-1, out=None):
+        return self._numpy(np.fft.fft, a, n, axis, out)
+
+    def ifft(self, a, n=None, axis=-1, out=None):
+        return self._numpy(np.fft.ifft, a, n, axis, out)
+
+    def rfft(self, a, n=None, axis=-1, out=None):
+        return self._numpy(np.fft.rfft, a, n, axis, out)
+
+
+class ScipyFFT(NumpyFFT):
+    """scipy.fft with ``threads`` workers.
+
+    Single precision is transformed natively and in place when ``out`` is
+    the input, pocketfft keeps its own plan cache.
+    """
+
+    name = 'scipy'
+
+    def _transform(self, func, a, n, axis, out):
+        result = func(a, n, axis, overwrite_x=out is a, workers=self.threads)
+        if out is None:
+            return result
+        if not np.may_share_memory(result, out):
+            out[...] = result
+        return out
+
+    def fft(self, a, n=None, axis=-1, out=None):
+        return self._transform(scipy_fft.fft, a, n, axis, out)
+
+    def ifft(self, a, n=None, axis=-1, out=None):
+        return self._transform(scipy_fft.ifft, a, n, axis, out)
+
+    def rfft(self, a, n=None, axis=-1, out=None):
+        return self._transform(scipy_fft.rfft, a, n, axis, out)
+
+
+class FFTWFFT(NumpyFFT):
+    """FFTW through pyfftw, one measured plan per transform shape.
+
+    Plans are kept least recently used first, up to MAX_PLANS. A plan
+    owns its aligned buffers, so each call copies the result out of it
+    and calls are serialized.
+    """
+
+    name = 'fftw'
+
+    def __init__(self, threads=1, effort='FFTW_MEASURE'):
+        super().__init__(threads)
+        self.effort = effort
+        self.plans = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _plan(self, kind, a, n, axis):
+        key = (kind, np.shape(a), a.dtype.str, n, axis)
+        if key in self.plans:
+            self.plans.move_to_end(key)
+            return self.plans[key]
+
+        builder = getattr(pyfftw.builders, kind)
+        self.plans[key] = builder(
+            np.empty_like(a), n=n, axis=axis, threads=self.threads,
+            planner_effort=self.effort, avoid_copy=False)
+        if len(self.plans) > MAX_PLANS:
+            self.plans.popitem(last=False)
+        return self.plans[key]
+
+    def _transform(self, kind, a, n, axis, out):
+        with self.lock:
+            result = self._plan(kind, a, n, axis)(a)
+            if out is None:
+                return result.copy()
+            out[...] = result
+        return out
+
+    def fft(self, a, n=None, axis=-1, out=None):
+        return self._transform('fft', a, n, axis, out)
+
+    def ifft(self, a, n=None, axis=-1, out=None):
+        return self._transform('ifft', a, n, axis, out)
+
+    def rfft(self, a, n=None, axis=-1, out=None):
+        return self._transform('rfft', a, n, axis, out)
+
+
+BACKENDS = {'numpy': NumpyFFT, 'scipy': ScipyFFT, 'fftw': FFTWFFT}
+numpy_fft = NumpyFFT()
+
+
+def available():
+    """Names of the backends whose library is installed."""
+    return ['numpy'] + (['scipy'] if scipy_fft is not None else []) + \
+        (['fftw'] if pyfftw is not None else [])
+
+
+def get_backend(name=None, threads=None):
+    """Backend by name, falls back to numpy if it is not installed."""
+    name = default_backend() if name is None else name
+    threads = default_threads() if threads is None else threads
+    if name not in available():
+        name = 'numpy'
+    return BACKENDS[name](threads)
@@ -0,0 +1,121 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+
+# single element updates between two full recomputes
+REFRESH = 256
+
+
+class IncrementalPattern(object):
+    """Array factor grid kept up to date under per-element weight changes.
+
+    The steering vector of an element is separable over the (azimuth,
+    elevation) grid, exp(-j2pi x sin(az)) * exp(-j2pi y sin(el)), so changing
+    one weight adds a rank-1 term and costs O(n_az * n_el) instead of a
+    full pattern evaluation. The unnormalized grid is accumulated in double
+    precision and recomputed by ``full(weight)`` every ``refresh`` updates
+    to clear the round-off drift.
+
+    ``full(weight)`` returns azimuth, elevation (degrees) and the array
+    factor normalized by sum(abs(weight)) of the (N,) weights, like the
+    arrayfactor pattern functions, and fixes the grid. ``index`` is the
+    position in the raveled weights.
+    """
+
+    def __init__(self, x, y, weight, full, refresh=REFRESH):
+        self.x = np.ravel(x).astype(float)
+        self.y = np.ravel(y).astype(float)
+        self.base = np.ravel(weight).astype(complex)
+        self.weight = self.base.copy()
+        self.full = full
+        self.refresh = refresh
+        self.recompute()
+        self.u = np.sin(self.azimuth / 180 * np.pi)
+        self.v = np.sin(self.elevation / 180 * np.pi)
+
+    def recompute(self):
+        """Full evaluation of the grid, resets the drift."""
+        azimuth, elevation, AF = self.full(self.weight)
+        self.azimuth = np.asarray(azimuth, dtype=float)
+        self.elevation = np.asarray(elevation, dtype=float)
+        self.norm = np.sum(np.abs(self.weight))
+        self.AF = np.array(AF, dtype=complex).reshape(
+            np.size(self.azimuth), np.size(self.elevation))
+        if self.norm > 0:
+            self.AF *= self.norm
+        self.updates = 0
+
+    def update(self, index, weight):
+        """Set the weights of the elements at ``index`` (int or array),
+        applied as one rank-k product."""
+        index = np.atleast_1d(index)
+        weight = np.broadcast_to(
+            np.asarray(weight, dtype=complex), np.shape(index))
+        delta = weight - self.weight[index]
+        self.norm += np.sum(np.abs(weight) - np.abs(self.weight[index]))
+        self.weight[index] = weight
+        self.updates += np.size(index)
+        if self.updates >= self.refresh:
+            self.recompute()
+            return
+
+        a = np.exp(-2j * np.pi * np.multiply.outer(self.u, self.x[index]))
+        b = np.exp(-2j * np.pi * np.multiply.outer(self.y[index], self.v))
+        b *= delta[:, np.newaxis]
+        self.AF += a @ b
+
+    def disable(self, index):
+        """Switch elements off (failure)."""
+        self.update(index, 0)
+
+    def enable(self, index):
+        """Restore the original weights of the elements."""
+        self.update(index, self.base[np.atleast_1d(index)])
+
+    def pattern(self):
+        """Normalized array factor, a fresh (n_az, n_el) array."""
+        AF = self.AF.copy()
+        if self.norm > 0:
+            AF /= self.norm
+        return AF
@@ -0,0 +1,215 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+import arrayfactor
+from dbkernel import DbKernel
+import directsum
+
+# trials transformed together in one stacked FFT
+BATCH = 64
+# histogram resolution of the streamed percentiles (dB)
+BIN_WIDTH = 0.1
+# cap of the histogram counts, bins widen on large grids to stay below it
+MAX_BYTES = 256 << 20
+
+
+class PatternHistogram(object):
+    """Streaming statistics of dB patterns over many trials.
+
+    Every grid point keeps a histogram of ``bin_width`` dB bins between
+    ``floor`` and 0 dB and a running sum of the power, so percentiles and
+    the mean pattern need O(points * bins) memory however many trials are
+    added. On large 2D grids the bins are widened so the counts stay
+    within ``max_bytes``.
+    """
+
+    def __init__(self, shape, floor=-100, bin_width=BIN_WIDTH,
+                 max_bytes=MAX_BYTES):
+        self.shape = tuple(shape)
+        self.floor = floor
+        points = int(np.prod(self.shape))
+        self.num_bins = max(min(
+            int(np.ceil(-floor / bin_width)),
+            max_bytes // (points * np.dtype(np.uint32).itemsize)), 1)
+        self.bin_width = max(bin_width, -floor / self.num_bins)
+        self.counts = np.zeros((points, self.num_bins), dtype=np.uint32)
+        self.power = np.zeros(int(np.prod(self.shape)))
+        self.trials = 0
+
+    def add(self, pattern):
+        """Add a (B, ...) batch of dB patterns."""
+        pattern = np.reshape(pattern, (-1, np.shape(self.counts)[0]))
+        self.power += np.sum(10 ** (pattern / 10), axis=0)
+        index = ((pattern - self.floor) / self.bin_width).astype(np.intp)
+        np.clip(index, 0, self.num_bins - 1, out=index)
+        index += np.arange(0, np.shape(self.counts)[0])[np.newaxis, :] * \
+            self.num_bins
+        # in place, the indices of one trial are all distinct
+        counts = self.counts.reshape(-1)
+        for trial in index:
+            counts[trial] += 1
+        self.trials += np.shape(pattern)[0]
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.power += other.power
+        self.trials += other.trials
+
+    def mean(self):
+        """Mean power pattern (dB)."""
+        power = self.power / max(self.trials, 1)
+        return (10 * np.log10(np.maximum(
+            power, 10 ** (self.floor / 10)))).reshape(self.shape)
+
+    def percentile(self, q):
+        """``q`` percent of the trials lie at or below the returned pattern
+        (dB), interpolated inside the histogram bin."""
+        cumulative = np.cumsum(self.counts, axis=1, dtype=np.int64)
+        target = q / 100 * self.trials
+        index = np.minimum(
+            np.sum(cumulative < target, axis=1), self.num_bins - 1)
+        rows = np.arange(0, np.shape(cumulative)[0])
+        below = np.where(index > 0, cumulative[rows, index - 1], 0)
+        count = self.counts[rows, index]
+        fraction = np.clip((target - below) / np.maximum(count, 1), 0, 1)
+        return (self.floor + (index + fraction) * self.bin_width).reshape(
+            self.shape)
+
+
+def failure_masks(rng, num, size, rate):
+    """(num, size) bool masks of the working elements, each element fails
+    independently with probability ``rate``."""
+    return rng.random((num, size)) >= rate
+
+
+def batch_pattern(x, y, weight, grid, nfft_az, nfft_el, plot_az=0,
+                  plot_el=0, az_range=None, el_range=None):
+    """Normalized array factors of a batch of weight sets, (B, sizex,
+    sizey) through one stacked FFT when ``grid`` holds (spacingx,
+    spacingy), otherwise (B, N) at ``x``, ``y`` through one direct sum.
+    Returns azimuth, elevation and the (B, n_az, n_el) array factors."""
+    if grid is not None:
+        return arrayfactor.fft_pattern(
+            weight, grid[0], grid[1], nfft_az, nfft_el, plot_az, plot_el,
+            az_range, el_range)
+    # one (N, B) weight matrix through the direct sum
+    weight = np.transpose(weight)
+    azimuth, elevation = arrayfactor.angle_axes(
+        nfft_az, nfft_el, plot_az, plot_el, az_range, el_range)
+    el_grid, az_grid = np.meshgrid(elevation, azimuth)
+    AF = np.moveaxis(directsum.array_factor(
+        x, y, weight, az_grid, el_grid), -1, 0)
+    AF /= np.maximum(np.sum(np.abs(weight), axis=0),
+                     np.finfo(float).tiny)[:, np.newaxis, np.newaxis]
+    return azimuth, elevation, AF
+
+
+def _trials(job):
+    """Histogram of a run of (seed, size) batches, run in a worker
+    process."""
+    (batches, rate, x, y, weight, grid, nfft_az, nfft_el, plot_az,
+     plot_el, az_range, el_range, floor, bin_width) = job
+    kernel = DbKernel()
+    histogram = None
+    for seed, batch in batches:
+        rng = np.random.default_rng(seed)
+        masks = failure_masks(rng, batch, np.size(weight), rate)
+        azimuth, elevation, AF = batch_pattern(
+            x, y, weight * masks.reshape((batch,) + np.shape(weight)), grid,
+            nfft_az, nfft_el, plot_az, plot_el, az_range, el_range)
+        pattern = kernel(AF, floor=floor)
+        if histogram is None:
+            histogram = PatternHistogram(
+                np.shape(pattern)[1:], floor, bin_width)
+        histogram.add(pattern)
+    return azimuth, elevation, histogram
+
+
+def run_batches(func, trials, seed, workers, *args):
+    """Call ``func((batches,) + args)`` on runs of consecutive (seed, size)
+    batches of ``BATCH`` trials, one run per worker process (all cores by
+    default), and yield the results in order. Every batch has its own
+    seed, so the trials do not depend on the number of workers."""
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn(-(-trials // BATCH))
+    batches = [(s, min(BATCH, trials - k * BATCH))
+               for k, s in enumerate(seeds)]
+    step = -(-len(batches) // workers)
+    jobs = [(batches[k:k + step],) + args
+            for k in range(0, len(batches), step)]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(func, jobs):
+                yield result
+    else:
+        for job in jobs:
+            yield func(job)
+
+
+def failure_analysis(x, y, weight, rate, trials, nfft_az, nfft_el,
+                     plot_az=0, plot_el=0, az_range=None, el_range=None,
+                     grid=None, floor=-100, bin_width=BIN_WIDTH, seed=0,
+                     workers=None):
+    """Pattern statistics under random element failures.
+
+    ``weight`` is the (sizex, sizey) weight grid when ``grid`` holds its
+    (spacingx, spacingy), trials then run through stacked FFTs, otherwise
+    the (N,) weights at ``x``, ``y`` go through a batched direct sum.
+    Batches of trials are spread over ``workers`` processes with
+    run_batches().
+
+    Returns azimuth, elevation and the merged PatternHistogram.
+    """
+    if grid is None:
+        weight = np.ravel(weight)
+    results = run_batches(
+        _trials, trials, seed, workers, rate, x, y, weight, grid, nfft_az,
+        nfft_el, plot_az, plot_el, az_range, el_range, floor, bin_width)
+    azimuth, elevation, histogram = next(results)
+    for result in results:
+        histogram.merge(result[2])
+    return azimuth, elevation, histogram
@@ -0,0 +1,90 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+
+BEAM_COUNT = 8
+# bytes of the patterns transformed in one batched pass
+PASS_BYTES = 4 << 20
+
+
+def beam_angles(center, count, spacing=None, length=1.0):
+    """Angles (degrees) of ``count`` beams fanned out around ``center``.
+
+    ``spacing`` is in degrees, None spaces the beams orthogonally, 1 /
+    ``length`` apart in direction cosine for an aperture of ``length`` λ.
+    Beams outside the visible space are dropped.
+    """
+    offset = np.arange(0, count) - (count - 1) / 2
+    if spacing is None:
+        u = np.sin(center / 180 * np.pi) + offset / max(length, 0.5)
+        angle = np.arcsin(u[np.abs(u) <= 1]) / np.pi * 180
+    else:
+        angle = center + offset * spacing
+        angle = angle[np.abs(angle) <= 90]
+    if np.size(angle) == 0:
+        return np.array([center], dtype=float)
+    return angle
+
+
+def steering_stack(x, y, beam_az, beam_el, dtype=complex):
+    """(B, N) steering vectors of the N elements for B beams."""
+    return np.exp(1j * 2 * np.pi * (
+        np.multiply.outer(np.sin(np.asarray(beam_az) / 180 * np.pi),
+                          np.ravel(x)) +
+        np.multiply.outer(np.sin(np.asarray(beam_el) / 180 * np.pi),
+                          np.ravel(y)))).astype(dtype, copy=False)
+
+
+def crossover(angle, cut, beams):
+    """Levels (dB) where adjacent beams cross, for a (B, P) dB ``cut``
+    over the ascending ``angle`` axis along which the beams are fanned."""
+    order = np.argsort(beams)
+    index = np.argmin(np.abs(np.subtract.outer(
+        np.asarray(angle), np.asarray(beams)[order])), axis=0)
+    levels = np.empty(max(np.size(order) - 1, 0))
+    for k in range(0, np.size(levels)):
+        lo, hi = sorted((index[k], index[k + 1]))
+        levels[k] = np.max(np.minimum(cut[order[k], lo:hi + 1],
+                                      cut[order[k + 1], lo:hi + 1]))
+    return levels
@@ -0,0 +1,114 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+import fftbackend
+
+# Type-1 non-uniform FFT by Gaussian gridding, see L. Greengard and J.-Y. Lee,
+# "Accelerating the nonuniform fast Fourier transform", SIAM Review, 2004.
+#
+#   f[k] = sum_j c[j] * exp(-1j * k * x[j])
+#   k = -(n // 2), ..., n - n // 2 - 1
+#
+# The sources are spread onto a 2x oversampled grid with a truncated Gaussian,
+# transformed with a regular FFT and the Gaussian is divided out afterwards.
+
+OVERSAMPLING = 2
+
+
+def _gridding(n, eps):
+    msp = int(np.clip(np.ceil(-np.log10(eps)), 2, 16))
+    nr = OVERSAMPLING * n
+    tau = np.pi * msp / (n * n * OVERSAMPLING * (OVERSAMPLING - 0.5))
+    return msp, nr, tau
+
+
+def _spread_kernel(x, msp, nr, tau):
+    h = 2 * np.pi / nr
+    x = np.mod(x, 2 * np.pi)
+    m0 = np.floor(x / h).astype(np.int64)
+    offset = np.arange(-msp + 1, msp + 1)
+    idx = m0[:, np.newaxis] + offset
+    kernel = np.exp(-(x[:, np.newaxis] - idx * h) ** 2 / (4 * tau))
+    return np.mod(idx, nr), kernel
+
+
+def _deconvolve(n, nr, tau):
+    k = np.arange(0, n) - n // 2
+    scale = np.sqrt(np.pi / tau) * np.exp(k * k * tau) / nr
+    return np.mod(k, nr), scale
+
+
+def _accumulate(idx, values, size):
+    idx = idx.ravel()
+    values = values.ravel()
+    return np.bincount(idx, weights=values.real, minlength=size) + \
+        1j * np.bincount(idx, weights=values.imag, minlength=size)
+
+
+def nufft1d(x, c, n, eps=1e-6, fft_backend=None):
+    msp, nr, tau = _gridding(n, eps)
+    idx, kernel = _spread_kernel(np.asarray(x, dtype=float), msp, nr, tau)
+    grid = _accumulate(idx, np.asarray(c)[:, np.newaxis] * kernel, nr)
+    k_idx, scale = _deconvolve(n, nr, tau)
+    fft_backend = fft_backend or fftbackend.numpy_fft
+    return fft_backend.fft(grid, out=grid)[k_idx] * scale
+
+
+def nufft2d(x, y, c, n1, n2, eps=1e-6, fft_backend=None):
+    msp1, nr1, tau1 = _gridding(n1, eps)
+    msp2, nr2, tau2 = _gridding(n2, eps)
+    idx1, kernel1 = _spread_kernel(np.asarray(x, dtype=float), msp1, nr1, tau1)
+    idx2, kernel2 = _spread_kernel(np.asarray(y, dtype=float), msp2, nr2, tau2)
+
+    idx = idx1[:, :, np.newaxis] * nr2 + idx2[:, np.newaxis, :]
+    values = np.asarray(c)[:, np.newaxis, np.newaxis] * \
+        kernel1[:, :, np.newaxis] * kernel2[:, np.newaxis, :]
+    grid = _accumulate(idx, values, nr1 * nr2).reshape(nr1, nr2)
+
+    k1_idx, scale1 = _deconvolve(n1, nr1, tau1)
+    k2_idx, scale2 = _deconvolve(n2, nr2, tau2)
+    fft_backend = fft_backend or fftbackend.numpy_fft
+    spectrum = fft_backend.fft(grid, axis=0, out=grid)
+    fft_backend.fft(spectrum, axis=1, out=spectrum)
+    return spectrum[np.ix_(k1_idx, k2_idx)] * np.outer(scale1, scale2)
@@ -0,0 +1,86 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import json
+import os
+import numpy as np
+
+# dB pattern grids too large for memory, a (n_az, n_el) .npy array opened
+# as a memory map plus a .json sidecar with the angle axes and the array
+# configuration the grid was computed from
+
+
+def sidecar(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def create(path, azimuth, elevation, dtype=np.float32, config=None):
+    """Memory-mapped (len(azimuth), len(elevation)) array at ``path``,
+    the axes (degrees) and ``config`` go to the sidecar."""
+    pattern = np.lib.format.open_memmap(
+        path, mode='w+', dtype=dtype,
+        shape=(np.size(azimuth), np.size(elevation)))
+    info = {'azimuth': np.asarray(azimuth, dtype=float).tolist(),
+            'elevation': np.asarray(elevation, dtype=float).tolist(),
+            'unit': 'dB', 'config': config or {}}
+    with open(sidecar(path), 'w') as f:
+        json.dump(info, f)
+    return pattern
+
+
+def remove(path):
+    os.remove(path)
+    os.remove(sidecar(path))
+
+
+def metadata(path):
+    with open(sidecar(path)) as f:
+        return json.load(f)
+
+
+def load(path, mmap_mode='r'):
+    """Azimuth, elevation (degrees) and the memory-mapped pattern (dB),
+    nothing is read from the grid until it is indexed."""
+    info = metadata(path)
+    pattern = np.load(path, mmap_mode=mmap_mode)
+    return np.array(info['azimuth']), np.array(info['elevation']), pattern
@@ -0,0 +1,147 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+import arrayfactor
+from dbkernel import DbKernel
+import directsum
+import montecarlo
+import tolerance
+
+
+def perturb(rng, x, y, sigma, distribution='normal'):
+    """Element positions (λ) with random offsets, ``sigma`` is the standard
+    deviation of a 'normal' or the half width of a 'uniform' offset, a
+    scalar or (sigma_x, sigma_y)."""
+    sigma_x, sigma_y = np.broadcast_to(sigma, (2,))
+    if distribution == 'uniform':
+        return (x + rng.uniform(-sigma_x, sigma_x, np.shape(x)),
+                y + rng.uniform(-sigma_y, sigma_y, np.shape(y)))
+    return (x + sigma_x * rng.standard_normal(np.shape(x)),
+            y + sigma_y * rng.standard_normal(np.shape(y)))
+
+
+def _pattern(x, y, weight, method, nfft_az, nfft_el, plot_az, plot_el,
+             az_range, el_range, eps):
+    if method == 'direct':
+        return arrayfactor.direct_pattern(
+            x, y, weight, nfft_az, nfft_el, plot_az, plot_el,
+            max_bytes=directsum.MAX_BYTES, az_range=az_range,
+            el_range=el_range)
+    return arrayfactor.nufft_pattern(
+        x, y, weight, nfft_az, nfft_el, plot_az, plot_el, eps, az_range,
+        el_range)
+
+
+def _trials(job):
+    """Histogram and lobe metrics of a run of (seed, size) batches, run in
+    a worker process."""
+    (batches, x, y, weight, sigma, distribution, metrics, method, args,
+     floor) = job
+    kernel = DbKernel()
+    histogram = None
+    values = []
+    for seed, batch in batches:
+        rng = np.random.default_rng(seed)
+        pattern = np.stack([kernel(_pattern(
+            *perturb(rng, x, y, sigma, distribution), weight, method,
+            *args)[2], floor=floor) for k in range(batch)])
+        if histogram is None:
+            histogram = montecarlo.PatternHistogram(
+                np.shape(pattern)[1:], floor)
+        histogram.add(pattern)
+        values.append(metrics(pattern))
+    return histogram, values
+
+
+def position_analysis(x, y, weight, sigma, trials, nfft_az, nfft_el,
+                      plot_az=0, plot_el=0, az_range=None, el_range=None,
+                      distribution='normal', method='nufft', eps=1e-6,
+                      floor=-100, seed=0, workers=None):
+    """Pattern statistics under random element position errors.
+
+    Every trial moves the elements at ``x``, ``y`` (λ) with perturb() and
+    evaluates the (N,) ``weight`` there with the NUFFT ('nufft') or the
+    chunked direct sum ('direct') on the u_axis() grid. Batches of trials
+    are spread over ``workers`` processes with montecarlo.run_batches()
+    and reduced to a PatternHistogram and per-trial lobe metrics in the
+    workers.
+
+    Returns azimuth, elevation and a dict like
+    tolerance.tolerance_analysis() with the 'ideal_*' and per-trial 'psl',
+    'msl', 'azimuth' and 'elevation', the 'expected_psl', 'expected_msl',
+    rms 'pointing_error' (degrees) and the 'histogram'.
+    """
+    x = np.ravel(x).astype(float)
+    y = np.ravel(y).astype(float)
+    weight = np.ravel(weight)
+    args = (nfft_az, nfft_el, plot_az, plot_el, az_range, el_range, eps)
+    azimuth, elevation, AF = _pattern(x, y, weight, method, *args)
+    ideal = DbKernel()(AF, floor=floor)
+    metrics = tolerance.LobeMetrics(azimuth, elevation, ideal)
+    result = {}
+    for name, value in zip(('psl', 'msl', 'azimuth', 'elevation'),
+                           metrics(ideal[np.newaxis])):
+        result['ideal_' + name] = value[0]
+
+    histogram = None
+    values = []
+    for part, part_values in montecarlo.run_batches(
+            _trials, trials, seed, workers, x, y, weight, sigma,
+            distribution, metrics, method, args, floor):
+        if histogram is None:
+            histogram = part
+        else:
+            histogram.merge(part)
+        values += part_values
+    for k, name in enumerate(('psl', 'msl', 'azimuth', 'elevation')):
+        result[name] = np.concatenate([value[k] for value in values])
+    result['histogram'] = histogram
+
+    result['expected_psl'] = np.mean(result['psl'])
+    result['expected_msl'] = 10 * np.log10(np.mean(10 ** (
+        result['msl'] / 10)))
+    result['pointing_error'] = np.sqrt(np.mean(
+        (result['azimuth'] - result['ideal_azimuth']) ** 2 +
+        (result['elevation'] - result['ideal_elevation']) ** 2))
+    return azimuth, elevation, result
@@ -0,0 +1,99 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from collections import OrderedDict
+import threading
+import numpy as np
+
+
+class AngleResampler:
+    """Linear resampling of FFT patterns (uniform in u = sin(angle)) onto a
+    uniform angle grid.
+
+    Gather indices and weights only depend on the source axis and the target
+    grid, so they are cached and every frame costs one gather plus one
+    multiply-add.
+    """
+
+    def __init__(self, max_tables=16):
+        self.max_tables = max_tables
+        self.tables = OrderedDict()
+        self.lock = threading.Lock()
+
+    def table(self, angle, num=None, dtype=float):
+        num = np.shape(angle)[0] if num is None else num
+        # the source axis is uniform in u, its ends and length identify it
+        key = (np.shape(angle)[0], float(angle[0]), float(angle[-1]), num,
+               np.dtype(dtype).str)
+        with self.lock:
+            if key in self.tables:
+                self.tables.move_to_end(key)
+                return self.tables[key]
+
+        target = np.linspace(angle[0], angle[-1], num)
+        u_src = np.sin(angle / 180 * np.pi)
+        u_dst = np.sin(target / 180 * np.pi)
+        lower = np.clip(np.searchsorted(u_src, u_dst, side='right') - 1,
+                        0, np.shape(u_src)[0] - 2)
+        frac = (u_dst - u_src[lower]) / (u_src[lower + 1] - u_src[lower])
+        frac = np.clip(frac, 0, 1)
+        index = np.stack((lower, lower + 1), axis=-1)
+        weight = np.stack((1 - frac, frac), axis=-1).astype(dtype)
+
+        table = (target, index, weight)
+        with self.lock:
+            self.tables[key] = table
+            while len(self.tables) > self.max_tables:
+                self.tables.popitem(last=False)
+        return table
+
+    def resample(self, angle, pattern, axis=0, num=None):
+        """Resample ``pattern`` along ``axis`` sampled at ``angle`` (deg)."""
+        if np.shape(angle)[0] < 2:
+            return angle, pattern
+        target, index, weight = self.table(
+            angle, num, np.finfo(pattern.dtype).dtype)
+        pattern = np.moveaxis(pattern, axis, -1)
+        gathered = np.take(pattern, index, axis=-1)
+        pattern = np.einsum('...ij,ij->...i', gathered, weight)
+        return target, np.moveaxis(pattern, -1, axis)
@@ -0,0 +1,227 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+from dbkernel import DbKernel
+import montecarlo
+
+
+def quantize_phase(weight, bits):
+    """Weights with the phase rounded to a ``bits`` bit phase shifter."""
+    step = 2 * np.pi / 2 ** bits
+    return np.abs(weight) * np.exp(
+        1j * step * np.round(np.angle(weight) / step))
+
+
+def quantize_amplitude(weight, step_db, range_db=None):
+    """Weights with the attenuation below the largest amplitude rounded to
+    ``step_db`` dB steps, attenuations beyond ``range_db`` switch the
+    element off."""
+    amplitude = np.abs(weight)
+    peak = np.max(amplitude)
+    if peak == 0:
+        return weight
+    with np.errstate(divide='ignore'):
+        attenuation = -20 * np.log10(amplitude / peak)
+    attenuation = step_db * np.round(attenuation / step_db)
+    quantized = peak * 10 ** (-attenuation / 20)
+    if range_db is not None:
+        quantized[attenuation > range_db] = 0
+    return quantized * np.exp(1j * np.angle(weight))
+
+
+def random_errors(rng, weight, num, amplitude_db=0, phase_deg=0):
+    """``num`` realizations of ``weight`` with normal amplitude (dB) and
+    phase (degrees) errors of the given standard deviations, shape
+    (num,) + weight.shape."""
+    shape = (num,) + np.shape(weight)
+    error = np.exp(
+        rng.standard_normal(shape) * (amplitude_db / 20 * np.log(10)) +
+        1j * rng.standard_normal(shape) * (phase_deg / 180 * np.pi))
+    return weight * error
+
+
+def _lobe_extent(cut, peak):
+    """First and last index of the main lobe of a cut, walking downhill
+    from ``peak`` to the first null on each side."""
+    rising = np.nonzero(np.diff(cut[peak:]) >= 0)[0]
+    stop = peak + rising[0] if np.size(rising) else np.size(cut) - 1
+    falling = np.nonzero(np.diff(cut[:peak + 1]) <= 0)[0]
+    start = falling[-1] + 1 if np.size(falling) else 0
+    return start, stop
+
+
+def interpolate_peak(pattern, index, axis):
+    """Fractional peak index along ``axis`` by a parabola through the
+    samples around it."""
+    size = np.shape(pattern)[axis + 1]
+    k = index[axis]
+    if size < 3:
+        return k.astype(float)
+    k = np.clip(k, 1, size - 2)
+    rows = np.arange(0, np.shape(pattern)[0])
+    other = index[1 - axis]
+    if axis == 0:
+        left, mid, right = (pattern[rows, k + d, other] for d in (-1, 0, 1))
+    else:
+        left, mid, right = (pattern[rows, other, k + d] for d in (-1, 0, 1))
+    curvature = left - 2 * mid + right
+    offset = np.where(curvature < 0, 0.5 * (left - right) / np.where(
+        curvature < 0, curvature, -1), 0)
+    return k + np.clip(offset, -0.5, 0.5)
+
+
+class LobeMetrics(object):
+    """Peak sidelobe, mean sidelobe level and beam pointing of dB patterns
+    with the main lobe region taken from the error-free pattern."""
+
+    def __init__(self, azimuth, elevation, ideal):
+        self.azimuth = azimuth
+        self.elevation = elevation
+        peak = np.unravel_index(np.argmax(ideal), np.shape(ideal))
+        az_lobe = _lobe_extent(ideal[:, peak[1]], peak[0])
+        el_lobe = _lobe_extent(ideal[peak[0], :], peak[1])
+        self.lobe = (slice(az_lobe[0], az_lobe[1] + 1),
+                     slice(el_lobe[0], el_lobe[1] + 1))
+        self.sidelobes = np.ones(np.shape(ideal), dtype=bool)
+        self.sidelobes[self.lobe] = False
+
+    def __call__(self, pattern):
+        """(B,) peak sidelobe level and mean sidelobe level (dB relative
+        to the peak) and the (B,) azimuth and elevation of the beam
+        peak of a (B, n_az, n_el) batch."""
+        lobe = pattern[(slice(None),) + self.lobe]
+        flat = np.argmax(lobe.reshape(np.shape(lobe)[0], -1), axis=1)
+        index = np.unravel_index(flat, np.shape(lobe)[1:])
+        peak = np.max(lobe.reshape(np.shape(lobe)[0], -1), axis=1)
+        index = (index[0] + self.lobe[0].start,
+                 index[1] + self.lobe[1].start)
+        azimuth = np.interp(interpolate_peak(pattern, index, 0),
+                            np.arange(0, np.size(self.azimuth)),
+                            self.azimuth)
+        elevation = np.interp(interpolate_peak(pattern, index, 1),
+                              np.arange(0, np.size(self.elevation)),
+                              self.elevation)
+
+        if not np.any(self.sidelobes):
+            nan = np.full(np.shape(peak), np.nan)
+            return nan, nan, azimuth, elevation
+        sidelobes = pattern[:, self.sidelobes]
+        psl = np.max(sidelobes, axis=1) - peak
+        msl = 10 * np.log10(np.mean(
+            10 ** (sidelobes / 10), axis=1)) - peak
+        return psl, msl, azimuth, elevation
+
+
+def tolerance_analysis(x, y, weight, trials, nfft_az, nfft_el, plot_az=0,
+                       plot_el=0, az_range=None, el_range=None, grid=None,
+                       phase_bits=None, step_db=None, range_db=None,
+                       amplitude_db=0, phase_deg=0, floor=-100, seed=0,
+                       batch=montecarlo.BATCH):
+    """Pattern statistics of a beamformer with quantized weights and random
+    amplitude / phase errors.
+
+    ``weight`` is the ideal (taper times steering) weight, a (sizex,
+    sizey) grid when ``grid`` holds its (spacingx, spacingy), otherwise
+    (N,) at ``x``, ``y``. Phase shifter bits and attenuator steps
+    quantize it once, then ``trials`` realizations of the random errors
+    are evaluated ``batch`` at a time with montecarlo.batch_pattern().
+
+    Returns azimuth, elevation and a dict with the 'psl' and 'msl'
+    (peak and mean sidelobe level, dB below the peak) and 'azimuth' and
+    'elevation' (beam peak, degrees) per trial, the same of the ideal and
+    of the quantized error-free weights ('ideal_*', 'quantized_*'), the
+    'histogram' (montecarlo.PatternHistogram) of the patterns, the
+    'expected_psl', 'expected_msl' and rms 'pointing_error' (degrees) over
+    the trials and the analytic random 'error_floor' (dB) to compare with.
+    """
+    rng = np.random.default_rng(seed)
+    kernel = DbKernel()
+    if grid is None:
+        weight = np.ravel(weight)
+    quantized = np.asarray(weight)
+    if phase_bits is not None:
+        quantized = quantize_phase(quantized, phase_bits)
+    if step_db is not None:
+        quantized = quantize_amplitude(quantized, step_db, range_db)
+
+    args = (grid, nfft_az, nfft_el, plot_az, plot_el, az_range, el_range)
+    azimuth, elevation, AF = montecarlo.batch_pattern(
+        x, y, np.stack([weight, quantized]), *args)
+    reference = kernel(AF, floor=floor)
+    metrics = LobeMetrics(azimuth, elevation, reference[0])
+    result = {}
+    for name, value in zip(('psl', 'msl', 'azimuth', 'elevation'),
+                           metrics(reference)):
+        result['ideal_' + name] = value[0]
+        result['quantized_' + name] = value[1]
+
+    values = []
+    histogram = montecarlo.PatternHistogram(np.shape(reference)[1:], floor)
+    for start in range(0, trials, batch):
+        num = min(batch, trials - start)
+        pattern = kernel(montecarlo.batch_pattern(
+            x, y, random_errors(
+                rng, quantized, num, amplitude_db, phase_deg), *args)[2],
+            floor=floor)
+        histogram.add(pattern)
+        values.append(metrics(pattern))
+    for k, name in enumerate(('psl', 'msl', 'azimuth', 'elevation')):
+        result[name] = np.concatenate([value[k] for value in values])
+    result['histogram'] = histogram
+
+    result['expected_psl'] = np.mean(result['psl'])
+    result['expected_msl'] = 10 * np.log10(np.mean(10 ** (
+        result['msl'] / 10)))
+    result['pointing_error'] = np.sqrt(np.mean(
+        (result['azimuth'] - result['ideal_azimuth']) ** 2 +
+        (result['elevation'] - result['ideal_elevation']) ** 2))
+    # average power of the random error sidelobes relative to the steered
+    # peak, sigma^2 sum |w|^2 / (sum |w|)^2
+    variance = (amplitude_db / 20 * np.log(10)) ** 2 + \
+        (phase_deg / 180 * np.pi) ** 2
+    with np.errstate(divide='ignore'):
+        result['error_floor'] = 10 * np.log10(
+            variance * np.sum(np.abs(quantized) ** 2) /
+            max(np.sum(np.abs(quantized)) ** 2, np.finfo(float).tiny))
+    return azimuth, elevation, result
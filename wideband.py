@@ -0,0 +1,143 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+import directsum
+import tolerance
+
+STEERING = ('phase', 'ttd')
+
+
+def frequencies(center, bandwidth, num):
+    """``num`` frequencies spread evenly over the band."""
+    if num < 2:
+        return np.array([center], dtype=float)
+    return np.linspace(center - bandwidth / 2, center + bandwidth / 2, num)
+
+
+def angle_axis(num, angle_range=None, angle=0):
+    """Uniform angle axis (degrees) of a wideband pattern, or the cut angle
+    for num == 1."""
+    if num < 2:
+        return np.array([angle], dtype=float)
+    angle_range = angle_range or (-90, 90)
+    return np.linspace(angle_range[0], angle_range[1], num)
+
+
+def wideband_pattern(x, y, weight, frequency, center, azimuth, elevation,
+                     beam_az=0, beam_el=0, steering='phase', grid=None,
+                     threads=1, max_bytes=directsum.MAX_BYTES):
+    """Normalized array factors over frequency, shape (F, P, Q) for F
+    ``frequency`` points and the P ``azimuth`` and Q ``elevation`` angles
+    (degrees).
+
+    Positions (λ) and the steered ``weight`` hold at the ``center``
+    frequency. With 'phase' steering the weights stay fixed over the band
+    so the beam squints, with 'ttd' (true time delay) the steering phase
+    scales with frequency. Either way every frequency is the unsteered or
+    steered array evaluated at scaled direction cosines, so all of them
+    go through one evaluation: batched separable steering matrices when
+    ``grid`` holds the (spacingx, spacingy) of a (sizex, sizey) weight
+    grid, otherwise one chunked direct sum over all (f, az, el) points.
+    """
+    weight = np.asarray(weight)
+    dtype = np.result_type(weight.dtype, np.complex64)
+    norm = max(np.sum(np.abs(weight)), np.finfo(float).tiny)
+    ratio = np.asarray(frequency, dtype=float) / center
+    u = np.sin(np.asarray(azimuth, dtype=float) / 180 * np.pi)
+    v = np.sin(np.asarray(elevation, dtype=float) / 180 * np.pi)
+    if steering == 'ttd':
+        u0 = np.sin(beam_az / 180 * np.pi)
+        v0 = np.sin(beam_el / 180 * np.pi)
+        # remove the centre frequency steering, it is applied as a delay
+        weight = weight * np.exp(-1j * 2 * np.pi * (
+            np.reshape(x, np.shape(weight)) * u0 +
+            np.reshape(y, np.shape(weight)) * v0)).astype(dtype)
+        u = u - u0
+        v = v - v0
+    U = np.multiply.outer(ratio, u)
+    V = np.multiply.outer(ratio, v)
+
+    if grid is None:
+        AF = directsum.array_factor_uv(
+            x, y, np.ravel(weight), U[:, :, np.newaxis],
+            V[:, np.newaxis, :], threads, max_bytes)
+        return AF / norm
+
+    sizex, sizey = np.shape(weight)
+    num_az, num_el = np.size(u), np.size(v)
+    weight = weight.astype(dtype, copy=False)
+    xm = np.arange(0, sizex) * grid[0]
+    yn = np.arange(0, sizey) * grid[1]
+    # contract the cheaper side of the grid first
+    az_first = num_az * sizex * sizey + num_az * sizey * num_el <= \
+        sizex * sizey * num_el + num_az * sizex * num_el
+    itemsize = np.dtype(dtype).itemsize
+    per_freq = itemsize * (num_az * sizex + num_el * sizey + (
+        num_az * sizey if az_first else sizex * num_el) + num_az * num_el)
+    block = max(1, int(max_bytes // per_freq))
+    AF = np.empty((np.size(ratio), num_az, num_el), dtype=dtype)
+    for start in range(0, np.size(ratio), block):
+        stop = min(start + block, np.size(ratio))
+        steer_x = np.exp(-1j * 2 * np.pi * np.multiply.outer(
+            U[start:stop], xm)).astype(dtype)
+        steer_y = np.exp(-1j * 2 * np.pi * np.multiply.outer(
+            yn, V[start:stop])).astype(dtype)
+        steer_y = np.moveaxis(steer_y, 1, 0)
+        if az_first:
+            np.matmul(steer_x @ weight, steer_y, out=AF[start:stop])
+        else:
+            np.matmul(steer_x, weight @ steer_y, out=AF[start:stop])
+    AF /= norm
+    return AF
+
+
+def squint(azimuth, elevation, pattern):
+    """Azimuth and elevation (degrees) of the beam peak of each frequency
+    of a (F, P, Q) dB pattern, interpolated between the samples."""
+    flat = np.argmax(np.reshape(pattern, (np.shape(pattern)[0], -1)), axis=1)
+    index = np.unravel_index(flat, np.shape(pattern)[1:])
+    return (np.interp(tolerance.interpolate_peak(pattern, index, 0),
+                      np.arange(0, np.size(azimuth)), azimuth),
+            np.interp(tolerance.interpolate_peak(pattern, index, 1),
+                      np.arange(0, np.size(elevation)), elevation))
@@ -0,0 +1,128 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from collections import OrderedDict
+import threading
+import numpy as np
+
+# Default cap of the pooled scratch memory
+MAX_BYTES = 256 << 20
+
+
+class WorkspacePool:
+    """Reusable scratch buffers keyed by (name, shape, dtype).
+
+    Padded FFT inputs and raw FFT outputs have the same shape from frame to
+    frame, so they are kept and handed out again instead of being
+    reallocated. Buffers are evicted least recently used first once the
+    pool holds more than ``max_bytes``. Each thread gets its own buffers,
+    and arrays handed out are overwritten by the next call with the same
+    key, so they must never be emitted.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.buffers = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, name, shape, dtype, zero=False):
+        """Scratch array, uninitialized unless ``zero`` is set."""
+        shape = tuple(int(n) for n in np.atleast_1d(shape))
+        dtype = np.dtype(dtype)
+        key = (threading.get_ident(), name, shape, dtype.str)
+        with self.lock:
+            buffer = self.buffers.get(key)
+            if buffer is not None:
+                self.buffers.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                buffer = np.empty(shape, dtype=dtype)
+                if buffer.nbytes <= self.max_bytes:
+                    self.buffers[key] = buffer
+                    self.nbytes += buffer.nbytes
+                    self._evict()
+        if zero:
+            buffer.fill(0)
+        return buffer
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes:
+            key, buffer = self.buffers.popitem(last=False)
+            self.nbytes -= buffer.nbytes
+            self.evictions += 1
+
+    def resize(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.buffers.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {'buffers': len(self.buffers), 'nbytes': self.nbytes,
+                    'max_bytes': self.max_bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+
+def padded(pool, name, weight, length, axis=-1, dtype=None):
+    """``weight`` zero padded to ``length`` along ``axis`` in a pooled
+    buffer."""
+    shape = list(np.shape(weight))
+    size = shape[axis]
+    shape[axis] = length
+    buffer = pool.get(name, shape, weight.dtype if dtype is None else dtype)
+    index = [slice(None)] * len(shape)
+    index[axis] = slice(0, size)
+    buffer[tuple(index)] = weight
+    index[axis] = slice(size, None)
+    buffer[tuple(index)] = 0
+    return buffer
@@ -0,0 +1,111 @@
+"""
+    Antenna Array Analysis
+
+    Copyright (C) 2019  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+from collections import OrderedDict
+import threading
+import numpy as np
+from scipy.fft import next_fast_len
+import fftbackend
+import workspace
+
+# Chirp-z transform by Bluestein's algorithm, evaluated on a zoomed
+# direction-cosine window of a regular array
+#
+#   AF[k] = sum_n w[n] * exp(-1j * 2 * pi * n * spacing * (u0 + k * du))
+#
+# The spectrum of the chirp only depends on the transform geometry and is
+# cached, so a zoomed view costs three FFTs of length ~(N + M).
+
+_chirps = OrderedDict()
+_chirps_lock = threading.Lock()
+MAX_CHIRPS = 16
+
+
+def _chirp(size, num, alpha, length, dtype):
+    key = (size, num, alpha, length, np.dtype(dtype).str)
+    with _chirps_lock:
+        if key in _chirps:
+            _chirps.move_to_end(key)
+            return _chirps[key]
+
+    m = np.arange(-(size - 1), num)
+    chirp = np.zeros(length, dtype=complex)
+    chirp[np.mod(m, length)] = np.exp(1j * np.pi * alpha * m * m)
+    spectrum = np.fft.fft(chirp).astype(dtype, copy=False)
+    with _chirps_lock:
+        _chirps[key] = spectrum
+        while len(_chirps) > MAX_CHIRPS:
+            _chirps.popitem(last=False)
+    return spectrum
+
+
+def czt(weight, spacing, u0, du, num, axis=-1, pool=None, fft_backend=None):
+    """Array factor of a regular array along ``axis`` at u0 + k * du.
+
+    The padded transform buffer is taken from ``pool`` if given.
+    """
+    fft_backend = fft_backend or fftbackend.numpy_fft
+    weight = np.moveaxis(weight, axis, -1)
+    dtype = np.result_type(weight.dtype, np.complex64)
+    size = np.shape(weight)[-1]
+    alpha = spacing * du
+    length = next_fast_len(size + num - 1)
+
+    n = np.arange(0, size)
+    pre = np.exp(-1j * np.pi * (2 * spacing * u0 * n + alpha * n * n))
+    if pool is None:
+        spectrum = fft_backend.fft(
+            weight * pre.astype(dtype), n=length, axis=-1)
+    else:
+        spectrum = workspace.padded(pool, ('czt', axis), weight, length,
+                                    dtype=dtype)
+        spectrum[..., :size] *= pre.astype(dtype)
+        fft_backend.fft(spectrum, axis=-1, out=spectrum)
+    spectrum *= _chirp(size, num, alpha, length, dtype)
+    spectrum = fft_backend.ifft(spectrum, axis=-1, out=spectrum)
+
+    # the product copies the output out of the pooled buffer
+    k = np.arange(0, num)
+    post = np.exp(-1j * np.pi * alpha * k * k).astype(dtype)
+    AF = spectrum[..., :num] * post
+    return np.moveaxis(AF, -1, axis)